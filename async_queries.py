@@ -0,0 +1,325 @@
+# asyncio version of the query layer, built on the async Neo4j driver.
+# Transaction functions mirror the ones in queries.py and share their Cypher; like queries.py,
+# the execute_* coroutines return results and leave rendering to the caller. They also share its
+# profile and leaderboard caches, the change_log and the GRAPH_BACKEND=memory engine, so a
+# coroutine returns what its queries.py counterpart would.
+import asyncio
+from change_log import change_log
+from credentials import check_password_async, hash_password_async, sessions
+from db_connection import get_async_driver
+from models import PopularUser, Profile, Recommendation, SearchResult, UserSummary, from_map
+from neo4j import exceptions
+from queries import (
+    CREATE_USER_QUERY, CREATE_USERS_QUERY, DASHBOARD_LIST_LIMIT, FETCH_SIZE, FOLLOW_MANY_QUERY, FOLLOW_PAGE_SIZE,
+    GET_FOLLOWERS_QUERY, GET_FOLLOWING_QUERY, GET_MOST_FOLLOWED_QUERY, GET_PROFILE_QUERY, GRAPH_BACKEND, LIVE_RECOMMENDATIONS_QUERY,
+    LOGIN_QUERY, MUTUALS_PAGE_SIZE, PROFILE_DASHBOARD_QUERY, SEARCH_USERS_QUERY, SET_PASSWORD_HASH_QUERY,
+    STORED_RECOMMENDATIONS_QUERY, UNFOLLOW_QUERY, UPDATE_PROFILES_QUERY,
+    dashboard_from_record, memory_graph, most_followed_cache, mutual_counts_query, mutuals_query, new_passwords,
+    new_user_row, prepare_new_users, prepare_profile_updates, profile_cache, record_created_users,
+    record_profile_change, record_profile_updates, stored_changes, validate_new_user, validate_profile_changes,
+)
+from recommendations import DEFAULT_SCORING, RECOMMENDATION_PAGE_SIZE, scoring_params
+from search import SEARCH_INDEX, SEARCH_PAGE_SIZE, build_fulltext_query
+
+async def get_profile(tx, username):
+    result = await tx.run(GET_PROFILE_QUERY, username=username)
+    record = await result.single()
+    return from_map(Profile, record["profile"]) if record else None
+
+async def get_profile_dashboard(tx, username, list_limit=DASHBOARD_LIST_LIMIT):
+    result = await tx.run(PROFILE_DASHBOARD_QUERY, username=username, list_limit=list_limit)
+    record = await result.single()
+    return dashboard_from_record(record) if record else None
+
+async def get_following(tx, username, after="", limit=FOLLOW_PAGE_SIZE):
+    result = await tx.run(GET_FOLLOWING_QUERY, username=username, after=after, limit=limit)
+    return [UserSummary(**record["user"]) async for record in result]
+
+async def get_followers(tx, username, after="", limit=FOLLOW_PAGE_SIZE):
+    result = await tx.run(GET_FOLLOWERS_QUERY, username=username, after=after, limit=limit)
+    return [UserSummary(**record["user"]) async for record in result]
+
+async def get_mutuals(tx, currentUsername, friendUsername, mode="followedByBoth", skip=0, limit=MUTUALS_PAGE_SIZE):
+    result = await tx.run(mutuals_query(mode), currentUsername=currentUsername, friendUsername=friendUsername, skip=skip, limit=limit)
+    record = await result.single()
+    if record is None:
+        return 0, []
+    return record["total"], [UserSummary(**user) for user in record["page"]]
+
+async def get_mutual_counts(tx, pairs, mode="followedByBoth"):
+    result = await tx.run(mutual_counts_query(mode), pairs=[list(pair) for pair in pairs])
+    return {(record["currentUsername"], record["friendUsername"]): record["mutualCount"] async for record in result}
+
+async def follow_many(tx, currentUsername, targetUsernames):
+    targets = list(dict.fromkeys(targetUsernames))
+    result = await tx.run(FOLLOW_MANY_QUERY, currentUsername=currentUsername, targetUsernames=targets)
+    return {record["targetUsername"]: record["status"] async for record in result}
+
+async def follow(tx, currentUsername, targetUsername):
+    return (await follow_many(tx, currentUsername, [targetUsername]))[targetUsername]
+
+async def unfollow(tx, currentUsername, targetUsername):
+    result = await tx.run(UNFOLLOW_QUERY, currentUsername=currentUsername, targetUsername=targetUsername)
+    record = await result.single()
+    return bool(record and record["deleted"] > 0)
+
+async def search_users(tx, target, skip=0, limit=SEARCH_PAGE_SIZE):
+    search_query = build_fulltext_query(target)
+    if search_query is None:
+        return []
+
+    result = await tx.run(SEARCH_USERS_QUERY, index=SEARCH_INDEX, search_query=search_query, skip=skip, limit=limit)
+    return [SearchResult(**record["user"]) async for record in result]
+
+async def login(tx, username):
+    result = await tx.run(LOGIN_QUERY, username=username)
+    record = await result.single()
+    if record is None:
+        return None, None, None
+    return from_map(Profile, record["user"]), record["passwordHash"], record["legacyPassword"]
+
+async def set_password_hash(tx, username, password_hash):
+    result = await tx.run(SET_PASSWORD_HASH_QUERY, username=username, passwordHash=password_hash)
+    await result.consume()
+
+async def create_user(tx, new_user, password_hash):
+    result = await tx.run(CREATE_USER_QUERY, **new_user_row(new_user, password_hash))
+    record = await result.single()
+    return {**record["result"], "user": from_map(Profile, record["result"]["user"])}
+
+async def create_users(tx, new_users, password_hashes):
+    rows = [new_user_row(user, password_hash) for user, password_hash in zip(new_users, password_hashes)]
+    result = await tx.run(CREATE_USERS_QUERY, users=rows)
+    return {record["username"]: record["success"] async for record in result}
+
+async def update_profiles(tx, rows):
+    result = await tx.run(UPDATE_PROFILES_QUERY, rows=rows)
+    outcomes = {row["email"]: ("notFound", None) for row in rows}
+    async for record in result:
+        outcomes[record["email"]] = ("usernameTaken" if record["taken"] else "updated", record["previous"])
+    return outcomes
+
+async def get_recommendations(tx, current_username, skip=0, limit=RECOMMENDATION_PAGE_SIZE, scoring=DEFAULT_SCORING):
+    if scoring == DEFAULT_SCORING:
+        result = await tx.run(STORED_RECOMMENDATIONS_QUERY, current_username=current_username, skip=skip, limit=limit)
+        record = await result.single()
+        if record is None:
+            return []
+        if record["precomputed"]:
+            return [Recommendation(**user) for user in record["page"]]
+
+    result = await tx.run(LIVE_RECOMMENDATIONS_QUERY, current_username=current_username, **scoring_params(scoring, skip, limit))
+    return [Recommendation(**record["user"]) async for record in result]
+
+async def get_most_followed(tx):
+    result = await tx.run(GET_MOST_FOLLOWED_QUERY)
+    return [PopularUser(**record["user"]) async for record in result]
+
+async def read(tx_function, *args, **kwargs):
+    """
+    Runs a read transaction function in its own session, so several reads can run concurrently.
+    """
+    async with get_async_driver().session(fetch_size=FETCH_SIZE) as session:
+        return await session.execute_read(tx_function, *args, **kwargs)
+
+async def write(tx_function, *args, **kwargs):
+    async with get_async_driver().session() as session:
+        return await session.execute_write(tx_function, *args, **kwargs)
+
+async def async_memory_graph():
+    """
+    memory_graph() for coroutines: the first call loads the whole graph, so it runs off the event loop.
+    """
+    if GRAPH_BACKEND != "memory":
+        return None
+    return await asyncio.to_thread(memory_graph)
+
+async def execute_get_profile(username):
+    profile = profile_cache.cached(username)
+    if profile is None:
+        profile = await read(get_profile, username)
+        profile_cache.put(profile)
+    return profile
+
+async def execute_get_profile_dashboard(username, list_limit=DASHBOARD_LIST_LIMIT):
+    engine = await async_memory_graph()
+    if engine is not None:
+        return engine.dashboard(username, list_limit)
+    return await read(get_profile_dashboard, username, list_limit)
+
+async def execute_get_following(username, after="", limit=FOLLOW_PAGE_SIZE):
+    engine = await async_memory_graph()
+    if engine is not None:
+        return engine.following(username, after, limit)
+    return await read(get_following, username, after, limit)
+
+async def execute_get_followers(username, after="", limit=FOLLOW_PAGE_SIZE):
+    engine = await async_memory_graph()
+    if engine is not None:
+        return engine.followers(username, after, limit)
+    return await read(get_followers, username, after, limit)
+
+async def execute_get_mutuals(currentUsername, friendUsername, mode="followedByBoth", skip=0, limit=MUTUALS_PAGE_SIZE):
+    engine = await async_memory_graph()
+    if engine is not None:
+        return engine.mutuals(currentUsername, friendUsername, mode, skip, limit)
+    return await read(get_mutuals, currentUsername, friendUsername, mode, skip, limit)
+
+async def execute_get_mutual_counts(pairs, mode="followedByBoth"):
+    counts = await read(get_mutual_counts, pairs, mode)
+    return {tuple(pair): counts.get(tuple(pair), 0) for pair in pairs}
+
+async def execute_follow(currentUsername, targetUsername):
+    follow_result = await write(follow, currentUsername, targetUsername)
+    if follow_result == "created":
+        change_log.record("follow", currentUsername, targetUsername)
+    return follow_result
+
+async def execute_follow_many(currentUsername, targetUsernames):
+    if len(targetUsernames) == 0:
+        return {}
+    results = await write(follow_many, currentUsername, targetUsernames)
+    for targetUsername, status in results.items():
+        if status == "created":
+            change_log.record("follow", currentUsername, targetUsername)
+    return results
+
+async def execute_unfollow(currentUsername, targetUsername):
+    unfollow_result = await write(unfollow, currentUsername, targetUsername)
+    if unfollow_result:
+        change_log.record("unfollow", currentUsername, targetUsername)
+    return unfollow_result
+
+async def execute_search_users(target, skip=0, limit=SEARCH_PAGE_SIZE):
+    return await read(search_users, target, skip, limit)
+
+async def execute_login(username, password):
+    if len(username) == 0 or len(password) == 0:
+        return "Error: username or password cannot be empty", None
+    try:
+        user, password_hash, legacy_password = await read(login, username)
+        # scrypt runs on the credentials thread pool, keeping the event loop free during verification
+        valid, upgrade = await check_password_async(password, password_hash, legacy_password)
+        if not valid:
+            return "Invalid username or password", None
+        if upgrade:
+            await write(set_password_hash, user.username, await hash_password_async(password))
+        profile_cache.put(user)
+        return "Login successful", user
+    except exceptions.Neo4jError as e:
+        return f"Neo4j Error: {e.message}", None
+
+async def execute_create_user(new_user):
+    error = validate_new_user(new_user)
+    if error:
+        return error, None
+
+    password_hash = await hash_password_async(new_user["password"])
+    try:
+        result = await write(create_user, new_user, password_hash)
+        change_log.record("create", result["user"].username, fields=result["user"]._asdict())
+        return result["message"], result["user"]
+    except exceptions.ConstraintError:
+        return "Email or username already exists", None
+    except exceptions.Neo4jError as e:
+        return f"Neo4j Error: {e.message}", None
+
+async def execute_create_users(new_users, batch_size=1000):
+    """
+    Same outcomes as queries.execute_create_users(); each batch is hashed on the credentials thread pool.
+    """
+    outcomes, pending = prepare_new_users(new_users)
+
+    async with get_async_driver().session() as session:
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            batch = [new_users[i] for i in chunk]
+            password_hashes = await asyncio.gather(*(hash_password_async(new_user["password"]) for new_user in batch))
+            created, error = None, None
+            try:
+                try:
+                    created = await session.execute_write(create_users, batch, password_hashes)
+                except exceptions.ConstraintError:
+                    created = await session.execute_write(create_users, batch, password_hashes)
+            except exceptions.Neo4jError as e:
+                error = f"Neo4j Error: {e.message}"
+            record_created_users(new_users, chunk, created, error, outcomes)
+
+    return outcomes
+
+async def execute_update_profile(current_email, changes):
+    """
+    Same contract as queries.execute_update_profile().
+    """
+    error = validate_profile_changes(changes)
+    if error:
+        raise ValueError(error)
+    if len(changes) == 0:
+        return "updated"
+
+    password_hash = await hash_password_async(changes["password"]) if "password" in changes else None
+    rows = [{"email": current_email, "changes": stored_changes(changes, password_hash)}]
+    try:
+        status, previous = (await write(update_profiles, rows))[current_email]
+    except exceptions.ConstraintError:
+        return "usernameTaken"
+    if status == "updated":
+        record_profile_change(previous, rows[0]["changes"])
+    return status
+
+async def execute_update_profiles(updates, batch_size=1000):
+    """
+    Same outcomes as queries.execute_update_profiles().
+    """
+    outcomes, pending = prepare_profile_updates(updates)
+
+    password_hashes = iter(await asyncio.gather(*(hash_password_async(password) for password in new_passwords(pending))))
+    for row in pending:
+        row["changes"] = stored_changes(row["changes"], next(password_hashes) if "password" in row["changes"] else None)
+
+    async with get_async_driver().session() as session:
+        for start in range(0, len(pending), batch_size):
+            rows = pending[start:start + batch_size]
+            try:
+                results = await session.execute_write(update_profiles, rows)
+            except exceptions.ConstraintError:
+                results = await session.execute_write(update_profiles, rows)
+            record_profile_updates(rows, results, outcomes)
+    return outcomes
+
+async def execute_start_session(username, password):
+    """
+    Returns (message, user, token); the token is shared with queries.execute_get_session().
+    """
+    message, user = await execute_login(username, password)
+    if user is None:
+        return message, None, None
+    return message, user, sessions.issue(user.username)
+
+async def execute_get_session(token):
+    username = sessions.get(token)
+    return await execute_get_profile(username) if username is not None else None
+
+async def execute_get_recommendations(current_username, skip=0, limit=RECOMMENDATION_PAGE_SIZE, scoring=DEFAULT_SCORING):
+    engine = await async_memory_graph()
+    if engine is not None:
+        return engine.recommendations(current_username, skip, limit, scoring)
+    return await read(get_recommendations, current_username, skip, limit, scoring)
+
+async def execute_get_most_followed():
+    """
+    Served from the same leaderboard cache as queries.execute_get_most_followed(). A cold cache
+    fetches synchronously, so the lookup runs off the event loop.
+    """
+    return await asyncio.to_thread(most_followed_cache.get)
+
+async def execute_get_profile_overview(username, page_size=FOLLOW_PAGE_SIZE):
+    """
+    Fetches the profile and the first page of followers and following concurrently.
+    Returns (profile, followers, following).
+    """
+    return await asyncio.gather(
+        execute_get_profile(username),
+        execute_get_followers(username, limit=page_size),
+        execute_get_following(username, limit=page_size),
+    )
@@ -0,0 +1,261 @@
+# Benchmark harness: loads a synthetic graph and times every queries.py operation against it.
+# Point NEO4J_URI at a disposable local container; generated users are tagged and removed with --cleanup.
+import argparse
+import csv
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from itertools import cycle
+import queries
+from credentials import hash_password
+from db_connection import get_driver
+from graph_generator import DEGREE_DISTRIBUTIONS, generate_edge_chunks, write_edges
+from helpers import print_success
+from import_data import execute_import
+
+BENCHMARK_DIR = "benchmark_data"
+BENCHMARK_PREFIX = "bench"
+BENCHMARK_PASSWORD = "benchmark"
+# keep generated ids clear of the ids in profiles.csv
+BENCHMARK_ID_OFFSET = 10_000_000
+
+DEFAULT_USERS = 10000
+DEFAULT_ITERATIONS = 200
+DEFAULT_WARMUP = 20
+
+def read_templates(path="profiles.csv"):
+    """
+    Returns the name/bio/location/photo/followers columns of the real profiles, used to give
+    generated users realistic text for the full-text index.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        return [{key: row[key] for key in ("name", "bio", "location", "photo", "followers")} for row in csv.DictReader(f)]
+
+def generate_profiles(n_users, templates, password_hash):
+    """
+    Yields n_users profile rows in the profiles.csv format, cycling through the templates
+    so any graph size can be built from the real dataset. Every user shares password_hash,
+    so logins measure a real hash verification.
+    """
+    for i, template in zip(range(n_users), cycle(templates)):
+        username = f"{BENCHMARK_PREFIX}{i}"
+        yield {
+            "id": BENCHMARK_ID_OFFSET + i,
+            **template,
+            "username": username,
+            "email": f"{username}@example.com",
+            "password_hash": password_hash,
+        }
+
+def write_graph(directory, n_users, distribution, min_degree, max_degree, alpha, community_size, seed, templates_path="profiles.csv"):
+    """
+    Writes profiles.csv and edges.csv for a synthetic graph into directory, ready for import_data.
+    Returns (profiles_path, edges_path, edge_count).
+    """
+    os.makedirs(directory, exist_ok=True)
+    profiles_path = os.path.join(directory, "profiles.csv")
+    edges_path = os.path.join(directory, "edges.csv")
+
+    with open(profiles_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=["id", "name", "bio", "location", "photo", "followers", "username", "email", "password_hash"])
+        writer.writeheader()
+        writer.writerows(generate_profiles(n_users, read_templates(templates_path), hash_password(BENCHMARK_PASSWORD)))
+
+    chunks = generate_edge_chunks(n_users, distribution, min_degree, max_degree, alpha,
+                                  community_size=community_size, seed=seed)
+    edge_count = write_edges(chunks, edges_path, id_offset=BENCHMARK_ID_OFFSET)
+
+    return profiles_path, edges_path, edge_count
+
+def execute_cleanup(batch_size=10000):
+    """
+    Deletes every generated benchmark user and their relationships.
+    """
+    query = """
+    MATCH (u:User)
+    WHERE u.id >= $offset AND u.username STARTS WITH $prefix
+    CALL {
+        WITH u
+        DETACH DELETE u
+    } IN TRANSACTIONS OF $batch_size ROWS
+    """
+    with get_driver().session() as session:
+        summary = session.run(query, offset=BENCHMARK_ID_OFFSET, prefix=BENCHMARK_PREFIX, batch_size=batch_size).consume()
+        return summary.counters.nodes_deleted
+
+def percentile(sorted_values, pct):
+    """
+    Nearest-rank percentile of an already sorted list.
+    """
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(pct / 100 * len(sorted_values)), 1)
+    return sorted_values[rank - 1]
+
+def time_operation(operation, iterations, warmup, concurrency, rng):
+    """
+    Runs operation(rng) warmup times untimed, then iterations times on concurrency threads.
+    Returns latency percentiles in milliseconds and the overall throughput.
+    """
+    for _ in range(warmup):
+        operation(rng)
+
+    # draw the inputs up front so every thread times only the database call
+    seeds = [rng.random() for _ in range(iterations)]
+
+    def timed(seed):
+        call_rng = random.Random(seed)
+        start = time.perf_counter()
+        operation(call_rng)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if concurrency > 1:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            latencies = list(executor.map(timed, seeds))
+    else:
+        latencies = [timed(seed) for seed in seeds]
+    wall = time.perf_counter() - start
+
+    latencies_ms = sorted(latency * 1000 for latency in latencies)
+    return {
+        "iterations": iterations,
+        "p50_ms": percentile(latencies_ms, 50),
+        "p95_ms": percentile(latencies_ms, 95),
+        "p99_ms": percentile(latencies_ms, 99),
+        "mean_ms": sum(latencies_ms) / len(latencies_ms),
+        "max_ms": latencies_ms[-1],
+        "throughput_per_s": iterations / wall,
+    }
+
+def build_operations(n_users):
+    """
+    Returns {name: operation(rng)} for every public read and write in queries.py.
+    Writes are paired (follow then unfollow) so repeated runs leave the graph unchanged.
+    """
+    def username(rng):
+        return f"{BENCHMARK_PREFIX}{rng.randrange(n_users)}"
+
+    def follow_unfollow(rng):
+        current, target = username(rng), username(rng)
+        if queries.execute_follow(current, target) == "created":
+            queries.execute_unfollow(current, target)
+
+    templates = read_templates()
+    search_terms = [template["name"].split()[0] for template in templates if template["name"].strip()]
+
+    return {
+        "get_profile": lambda rng: queries.execute_get_profile(username(rng)),
+        "get_profiles": lambda rng: queries.execute_get_profiles([username(rng) for _ in range(queries.SEARCH_PAGE_SIZE)]),
+        "get_profile_dashboard": lambda rng: queries.execute_get_profile_dashboard(username(rng)),
+        "get_following": lambda rng: queries.execute_get_following(username(rng)),
+        "get_followers": lambda rng: queries.execute_get_followers(username(rng)),
+        "get_mutuals": lambda rng: queries.execute_get_mutuals(username(rng), username(rng)),
+        "search_users": lambda rng: queries.execute_search_users(rng.choice(search_terms)),
+        "login": lambda rng: queries.execute_login(username(rng), BENCHMARK_PASSWORD),
+        "get_recommendations": lambda rng: queries.execute_get_recommendations(username(rng)),
+        # bypass the leaderboard cache to time the query itself
+        "get_most_followed": lambda rng: queries.fetch_most_followed(),
+        "follow_unfollow": follow_unfollow,
+    }
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(results, baseline_path):
+    """
+    Prints the p50/p95 change of each operation against a previous results file.
+    """
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    print(f"\nCompared with {baseline_path} ({baseline.get('commit')}):")
+    for name, current in results["operations"].items():
+        previous = baseline["operations"].get(name)
+        if previous is None:
+            continue
+        changes = []
+        for key in ("p50_ms", "p95_ms"):
+            change = (current[key] - previous[key]) / previous[key] * 100 if previous[key] else 0.0
+            changes.append(f"{key} {previous[key]:.2f} -> {current[key]:.2f} ({change:+.1f}%)")
+        print(f"{name}: " + ", ".join(changes))
+
+def execute_benchmark(n_users=DEFAULT_USERS, distribution="uniform", min_degree=3, max_degree=6, alpha=2.1,
+                      community_size=1000, seed=0, iterations=DEFAULT_ITERATIONS, warmup=DEFAULT_WARMUP, concurrency=1,
+                      only=None, load=True):
+    """
+    Optionally generates and imports the synthetic graph, then times each operation.
+    Returns the results dict that is written to JSON.
+    """
+    graph = {"users": n_users, "distribution": distribution, "min_degree": min_degree,
+             "max_degree": max_degree, "alpha": alpha, "community_size": community_size, "seed": seed}
+    if load:
+        start = time.perf_counter()
+        profiles_path, edges_path, edge_count = write_graph(BENCHMARK_DIR, n_users, distribution, min_degree, max_degree, alpha, community_size, seed)
+        print(f"Generated {n_users} users and {edge_count} edges in {time.perf_counter() - start:.2f}s")
+        execute_import(profiles_path, edges_path)
+        graph["edges"] = edge_count
+
+    rng = random.Random(seed)
+    operations = build_operations(n_users)
+    results = {
+        "commit": git_commit(),
+        "backend": queries.GRAPH_BACKEND,
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "graph": graph,
+        "iterations": iterations,
+        "concurrency": concurrency,
+        "operations": {},
+    }
+    for name, operation in operations.items():
+        if only and name not in only:
+            continue
+        stats = time_operation(operation, iterations, warmup, concurrency, rng)
+        results["operations"][name] = stats
+        print(f"{name}: p50 {stats['p50_ms']:.2f}ms  p95 {stats['p95_ms']:.2f}ms  p99 {stats['p99_ms']:.2f}ms  "
+              f"{stats['throughput_per_s']:,.0f} ops/s")
+    return results
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark every queries.py operation on a synthetic graph.")
+    parser.add_argument("--users", type=int, default=DEFAULT_USERS)
+    parser.add_argument("--distribution", choices=DEGREE_DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--min-degree", type=int, default=3)
+    parser.add_argument("--max-degree", type=int, default=6)
+    parser.add_argument("--alpha", type=float, default=2.1, help="power-law exponent")
+    parser.add_argument("--community-size", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--iterations", type=int, default=DEFAULT_ITERATIONS)
+    parser.add_argument("--warmup", type=int, default=DEFAULT_WARMUP)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--only", nargs="+", help="operation names to run")
+    parser.add_argument("--skip-load", action="store_true", help="reuse the graph loaded by a previous run")
+    parser.add_argument("--output", help="results file (default: benchmark-<commit>.json)")
+    parser.add_argument("--compare", help="previous results file to diff against")
+    parser.add_argument("--cleanup", action="store_true", help="delete the benchmark users and exit")
+    args = parser.parse_args()
+
+    if args.cleanup:
+        print_success(f"Deleted {execute_cleanup()} benchmark users.")
+        sys.exit(0)
+
+    results = execute_benchmark(args.users, args.distribution, args.min_degree, args.max_degree, args.alpha,
+                                args.community_size, args.seed, args.iterations, args.warmup, args.concurrency, args.only,
+                                load=not args.skip_load)
+
+    output = args.output or f"benchmark-{(results['commit'] or 'local')[:8]}.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=2)
+    print_success(f"\nResults written to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
@@ -0,0 +1,79 @@
+# In-process log of committed writes. In-memory caches subscribe to it and apply each change
+# incrementally, so they stay coherent with Neo4j without being reloaded.
+import threading
+import time
+from collections import deque
+from typing import NamedTuple, Optional
+
+CHANGE_KINDS = ("follow", "unfollow", "rename", "create", "update")
+# events kept for subscribers that join late and replay what they missed
+CHANGE_LOG_SIZE = 10000
+
+class ChangeEvent(NamedTuple):
+    sequence: int
+    at: float
+    kind: str
+    username: str
+    # the followed/unfollowed username, or the new username for a rename
+    target: Optional[str] = None
+    # profile fields for create and update
+    fields: Optional[dict] = None
+
+class ChangeLog:
+    """
+    Ordered, bounded log of changes. Every recorded event is passed to each subscriber
+    synchronously, so a cache is up to date as soon as the writing call returns.
+    """
+
+    def __init__(self, size=CHANGE_LOG_SIZE):
+        self.events = deque(maxlen=size)
+        self.sequence = 0
+        self.subscriber_errors = 0
+        self._subscribers = []
+        self._lock = threading.RLock()
+
+    def subscribe(self, callback, replay_after=None):
+        """
+        Calls callback(event) for every future change. With replay_after, the events recorded
+        after that sequence number are replayed first, so a cache loaded from a snapshot taken
+        at that point misses nothing. Subscribers must apply events idempotently.
+        """
+        with self._lock:
+            if replay_after is not None:
+                for event in self.since(replay_after):
+                    callback(event)
+            self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        with self._lock:
+            self._subscribers.remove(callback)
+
+    def record(self, kind, username, target=None, fields=None):
+        """
+        Appends a change and applies it to every subscriber. Call it only after the
+        write transaction has committed. Returns the ChangeEvent.
+        """
+        if kind not in CHANGE_KINDS:
+            raise ValueError(f"Unknown change kind '{kind}', expected one of {CHANGE_KINDS}")
+
+        with self._lock:
+            self.sequence += 1
+            event = ChangeEvent(self.sequence, time.time(), kind, username, target, fields)
+            self.events.append(event)
+            for callback in list(self._subscribers):
+                try:
+                    callback(event)
+                except Exception:
+                    # the write is already committed; a cache that failed to apply it is
+                    # repaired by its own reconciliation
+                    self.subscriber_errors += 1
+        return event
+
+    def since(self, sequence):
+        """
+        Returns the events still in the log that were recorded after the given sequence number.
+        """
+        with self._lock:
+            return [event for event in self.events if event.sequence > sequence]
+
+change_log = ChangeLog()
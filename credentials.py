@@ -0,0 +1,183 @@
+# Password hashing: salted scrypt hashes stored as "scrypt$n$r$p$salt$hash"
+import asyncio
+import base64
+import hashlib
+import hmac
+import os
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+# loads the env file before the settings below are read, whichever module imports this one first
+import settings
+
+# scrypt cost, tunable from the env file; existing hashes are upgraded on the next successful login
+SCRYPT_N = int(os.getenv("PASSWORD_SCRYPT_N", str(2 ** 14)))
+SCRYPT_R = int(os.getenv("PASSWORD_SCRYPT_R", "8"))
+SCRYPT_P = int(os.getenv("PASSWORD_SCRYPT_P", "1"))
+SALT_BYTES = 16
+HASH_BYTES = 32
+
+# hashlib.scrypt releases the GIL, so a thread pool verifies in parallel without blocking an event loop
+VERIFY_WORKERS = int(os.getenv("PASSWORD_VERIFY_WORKERS", str(os.cpu_count() or 4)))
+
+SESSION_TTL = float(os.getenv("SESSION_TTL", "900"))
+SESSION_CACHE_SIZE = int(os.getenv("SESSION_CACHE_SIZE", "100000"))
+
+def _b64(data):
+    return base64.b64encode(data).decode("ascii")
+
+def _scrypt(password, salt, n, r, p):
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          maxmem=128 * n * r * 2, dklen=HASH_BYTES)
+
+def hash_password(password, n=SCRYPT_N, r=SCRYPT_R, p=SCRYPT_P):
+    """
+    Returns a salted scrypt hash of password, with its parameters encoded alongside it.
+    """
+    salt = os.urandom(SALT_BYTES)
+    return f"scrypt${n}${r}${p}${_b64(salt)}${_b64(_scrypt(password, salt, n, r, p))}"
+
+def parse_hash(password_hash):
+    """
+    Returns (n, r, p, salt, digest), or None if the value is not a hash written by hash_password().
+    """
+    try:
+        scheme, n, r, p, salt, digest = password_hash.split("$")
+        if scheme != "scrypt":
+            return None
+        return int(n), int(r), int(p), base64.b64decode(salt), base64.b64decode(digest)
+    except (AttributeError, ValueError):
+        return None
+
+def verify_password(password, password_hash):
+    """
+    Checks password against a stored hash in constant time.
+    """
+    parsed = parse_hash(password_hash)
+    if parsed is None:
+        return False
+    n, r, p, salt, digest = parsed
+    return hmac.compare_digest(_scrypt(password, salt, n, r, p), digest)
+
+def needs_rehash(password_hash):
+    """
+    True when the hash was made with a different cost than the current configuration.
+    """
+    parsed = parse_hash(password_hash)
+    return parsed is None or parsed[:3] != (SCRYPT_N, SCRYPT_R, SCRYPT_P)
+
+_dummy_hash = None
+
+def check_password(password, password_hash, legacy_password=None):
+    """
+    Verifies a login attempt against the stored account. Accounts from before hashing only
+    have a plaintext legacy_password. Returns (valid, upgrade), where upgrade means the
+    caller should store a fresh hash_password(password) for the account.
+    """
+    global _dummy_hash
+    if password_hash:
+        valid = verify_password(password, password_hash)
+        return valid, valid and needs_rehash(password_hash)
+    if legacy_password is not None:
+        valid = hmac.compare_digest(password.encode("utf-8"), legacy_password.encode("utf-8"))
+        return valid, valid
+
+    # unknown user: spend the same time as a real check so usernames cannot be probed by timing
+    if _dummy_hash is None:
+        _dummy_hash = hash_password(secrets.token_hex(8))
+    verify_password(password, _dummy_hash)
+    return False, False
+
+_verify_pool = None
+_verify_pool_lock = threading.Lock()
+
+def verify_pool():
+    """
+    Returns the shared thread pool used for hashing and verifying outside the caller's thread.
+    """
+    global _verify_pool
+    if _verify_pool is None:
+        with _verify_pool_lock:
+            if _verify_pool is None:
+                _verify_pool = ThreadPoolExecutor(max_workers=VERIFY_WORKERS, thread_name_prefix="password")
+    return _verify_pool
+
+def hash_passwords(passwords):
+    """
+    Hashes passwords on the shared thread pool, e.g. for a signup batch or a generated
+    dataset. Returns hashes in input order.
+    """
+    return list(verify_pool().map(hash_password, passwords))
+
+async def check_password_async(password, password_hash, legacy_password=None):
+    """
+    check_password() on the shared thread pool, so an asyncio server keeps serving during a login storm.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(verify_pool(), check_password, password, password_hash, legacy_password)
+
+async def hash_password_async(password):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(verify_pool(), hash_password, password)
+
+class SessionCache:
+    """
+    Short-lived session tokens issued after a verified login, so later authenticated calls
+    check a token in memory instead of verifying the password hash again.
+    """
+
+    def __init__(self, ttl=SESSION_TTL, max_size=SESSION_CACHE_SIZE):
+        self.ttl = ttl
+        self.max_size = max_size
+        # token -> (username, expires_at), oldest first
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def issue(self, username):
+        token = secrets.token_urlsafe(32)
+        with self._lock:
+            self._sessions[token] = (username, time.monotonic() + self.ttl)
+            while len(self._sessions) > self.max_size:
+                self._sessions.popitem(last=False)
+        return token
+
+    def get(self, token):
+        """
+        Returns the username the token was issued to, or None if it is unknown or expired.
+        """
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+            username, expires_at = session
+            if expires_at <= time.monotonic():
+                del self._sessions[token]
+                return None
+            return username
+
+    def revoke(self, token):
+        with self._lock:
+            self._sessions.pop(token, None)
+
+    def revoke_user(self, username):
+        """
+        Ends every session of the user, e.g. after a password change.
+        """
+        with self._lock:
+            for token in [token for token, (name, _) in self._sessions.items() if name == username]:
+                del self._sessions[token]
+
+    def apply(self, event):
+        """
+        change_log subscriber: sessions follow the user across a rename.
+        """
+        if event.kind != "rename":
+            return
+        with self._lock:
+            for token, (name, expires_at) in self._sessions.items():
+                if name == event.username:
+                    self._sessions[token] = (event.target, expires_at)
+
+sessions = SessionCache()
@@ -1,75 +1,124 @@
 # File contains code that was used to parse the raw data into csv files
+import numpy as np
 import pandas as pd
 import pickle
-import random
 import string
-
-# convert the data into a csv file
-def to_csv():
-
-  dataset_directory = "LinkedIn_Dataset.pcl"
-  with open(dataset_directory, "rb") as f:
-      data = pickle.load(f)
-
-  df = pd.DataFrame(data)
-
-  intro_df = df['Intro'].apply(pd.Series)
+from collections import Counter
+from credentials import hash_passwords
+from graph_generator import generate_edge_chunks, write_edges
+
+# rows processed per chunk; memory use is bounded by one chunk, not the dataset
+CHUNK_SIZE = 100_000
+
+INTRO_FIELDS = ['Workplace', 'Location', 'Photo', 'Followers']
+PASSWORD_ALPHABET = np.array(list(string.ascii_letters + string.digits))
+
+def iter_record_chunks(dataset_path, chunk_size=CHUNK_SIZE):
+  """
+  Yields lists of at most chunk_size raw profile records from the pickle.
+  A file written by split_pickle() holds one pickled chunk after another and is read one
+  chunk at a time; the original single-object dump has to be loaded once and is then sliced.
+  """
+  with open(dataset_path, "rb") as f:
+    while True:
+      try:
+        data = pickle.load(f)
+      except EOFError:
+        return
+
+      if isinstance(data, pd.DataFrame):
+        data = data.to_dict("records")
+      for start in range(0, len(data), chunk_size):
+        yield data[start:start + chunk_size]
+      del data
+
+def split_pickle(dataset_path, output_path, chunk_size=CHUNK_SIZE):
+  """
+  Rewrites the dataset as a stream of chunk_size pickles so later runs never hold it all in memory.
+  """
+  with open(output_path, "wb") as out:
+    for records in iter_record_chunks(dataset_path, chunk_size):
+      pickle.dump(records, out, protocol=pickle.HIGHEST_PROTOCOL)
+
+def extract_profiles(records, first_id):
+  """
+  Flattens one chunk of raw records into profile rows. Ids are positions in the whole dataset.
+  """
+  df = pd.DataFrame.from_records(records, columns=['Full Name', 'Intro'])
+
+  # flatten the nested Intro dicts in one pass instead of a row-wise apply(pd.Series)
+  intros = [intro if isinstance(intro, dict) else {} for intro in df['Intro']]
+  intro_df = pd.json_normalize(intros, max_level=0).reindex(columns=INTRO_FIELDS)
+  intro_df.index = pd.RangeIndex(first_id, first_id + len(df))
+
+  intro_df['name'] = df['Full Name'].to_numpy()
+  intro_df['id'] = intro_df.index
 
   # Filter out rows where Location, Photo, or Followers are NaN
   filtered_df = intro_df.dropna(subset=['Location', 'Photo', 'Followers'])
 
-  fields_to_keep = ['Full Name', 'Workplace', 'Location', 'Photo', 'Followers']
-
-  filtered_df = filtered_df[fields_to_keep]
-  filtered_df['name'] = df['Full Name']
-  filtered_df["id"] = filtered_df.index
-
-  final_df = filtered_df[['id', 'name', 'Workplace', 'Location', 'Photo', 'Followers']]
-  final_df.rename(columns={
+  return filtered_df[['id', 'name', 'Workplace', 'Location', 'Photo', 'Followers']].rename(columns={
       'Workplace': 'bio',
       'Location': 'location',
       'Photo': 'photo',
       'Followers': 'followers',
-  }, inplace=True)
+  })
 
-  final_df.to_csv("profiles.csv", index=False)
+# convert the data into a csv file
+def to_csv(dataset_path="LinkedIn_Dataset.pcl", output_path="profiles.csv", chunk_size=CHUNK_SIZE):
+  first_id = 0
+  with open(output_path, "w", newline="", encoding="utf-8") as out:
+    for records in iter_record_chunks(dataset_path, chunk_size):
+      extract_profiles(records, first_id).to_csv(out, header=first_id == 0, index=False)
+      first_id += len(records)
 
 # create random 3-6 connections for each profile
 def create_connections():
-  df = pd.read_csv("profiles.csv")
-
-  user_ids = df['id'].tolist()
-  edges = set()
-
-  for user in user_ids:
-      possible_targets = [uid for uid in user_ids if uid != user]
-      targets = random.sample(possible_targets, k=random.randint(3,6))
-
-      for target in targets:
-          edge = tuple(sorted((user, target)))
-          edges.add(edge)
-
-  edges_df = pd.DataFrame(list(edges), columns=["source", "target"])
-  edges_df.to_csv("edges.csv", index=False)
-
-# add email, password, and username field to each profile
-def generate_auth():
-  df = pd.read_csv("profiles_without_auth.csv")
-
-  def generate_username(name):
-      parts = name.lower().split()
-      base = ''.join(parts)
-      suffix = str(random.randint(1,999))
-      return base + suffix
-
-  def generate_email(username):
-      return f"{username}@gmail.com"
-
-  def generate_password(length=8):
-      return ''.join(random.choices(string.ascii_letters + string.digits, k=length))
-
-  df['username'] = df['name'].apply(generate_username)
-  df['email'] = df['username'].apply(generate_email)
-  df['password'] = df['username'].apply(lambda _: generate_password())
-
-  df.to_csv("profiles.csv", index=False)
\ No newline at end of file
+  ids = pd.read_csv("profiles.csv", usecols=["id"])["id"].to_numpy()
+
+  # undirected: each pair is stored once, smaller id first
+  chunks = generate_edge_chunks(len(ids), "uniform", min_degree=3, max_degree=6, directed=False)
+  write_edges(chunks, "edges.csv", ids=ids)
+
+def generate_passwords(rng, count, length=8):
+  """
+  Returns count random alphanumeric passwords, drawn as one (count, length) array of characters.
+  """
+  chars = PASSWORD_ALPHABET[rng.integers(0, len(PASSWORD_ALPHABET), size=(count, length))]
+  return np.ascontiguousarray(chars).view(f"<U{length}").ravel()
+
+def generate_usernames(names, seen):
+  """
+  Returns a unique username for every name: the name lowercased with everything but letters
+  and digits removed, then "_" and how many times that base has occurred so far.
+  The base never contains "_", so different bases cannot collide. seen carries the
+  per-base counts between chunks, keeping usernames unique across the whole dataset.
+  """
+  base = names.fillna("").str.lower().str.replace(r"[\W_]+", "", regex=True)
+  base = base.mask(base == "", "user")
+
+  occurrence = base.groupby(base).cumcount() + 1 + base.map(seen).fillna(0).astype(int)
+  seen.update(base.value_counts().to_dict())
+  return base + "_" + occurrence.astype(str)
+
+# add email, username, and a hashed password to each profile
+def generate_auth(input_path="profiles_without_auth.csv", output_path="profiles.csv",
+                  credentials_path="credentials.csv", chunk_size=CHUNK_SIZE, seed=None):
+  """
+  Writes the profiles with a password_hash column. The generated plaintext passwords go only
+  to credentials_path (username,password) so test accounts can still log in.
+  """
+  rng = np.random.default_rng(seed)
+  seen = Counter()
+
+  with open(output_path, "w", newline="", encoding="utf-8") as out, \
+       open(credentials_path, "w", newline="", encoding="utf-8") as creds:
+    for i, df in enumerate(pd.read_csv(input_path, chunksize=chunk_size)):
+      df['username'] = generate_usernames(df['name'], seen)
+      df['email'] = df['username'] + "@gmail.com"
+
+      passwords = generate_passwords(rng, len(df)).tolist()
+      df['password_hash'] = hash_passwords(passwords)
+
+      df.to_csv(out, header=i == 0, index=False)
+      pd.DataFrame({'username': df['username'], 'password': passwords}).to_csv(creds, header=i == 0, index=False)
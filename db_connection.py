@@ -1,9 +1,10 @@
-import dotenv
+import atexit
 import os
-from neo4j import GraphDatabase
+import threading
+from neo4j import AsyncGraphDatabase, GraphDatabase
+from settings import load_status
 
 #Load credentials from the txt file
-load_status = dotenv.load_dotenv("Neo4j-59c90b3a-Created-2025-04-12.txt")
 if load_status is False:
     raise RuntimeError("Environment variables not loaded")
 else:
@@ -12,13 +13,69 @@ else:
 URI = os.getenv("NEO4J_URI")
 AUTH = (os.getenv("NEO4J_USERNAME"), os.getenv("NEO4J_PASSWORD"))
 
-# Create the driver to connect to Neo4j
-with GraphDatabase.driver(URI, auth=AUTH) as driver:
-    try:
-        driver.verify_connectivity()
-        print("Connection established")
-    except Exception as e:
-        print(f"Error verifying driver connection: {e}")
+# Connection pool settings, overridable from the same env file
+MAX_POOL_SIZE = int(os.getenv("NEO4J_MAX_POOL_SIZE", "50"))
+MAX_CONNECTION_LIFETIME = float(os.getenv("NEO4J_MAX_CONNECTION_LIFETIME", "3600"))
+CONNECTION_ACQUISITION_TIMEOUT = float(os.getenv("NEO4J_CONNECTION_ACQUISITION_TIMEOUT", "60"))
+
+_driver = None
+_driver_lock = threading.Lock()
+_async_driver = None
 
 def get_driver():
-    return driver
\ No newline at end of file
+    """
+    Returns the process-wide driver, creating it on first use.
+    The driver owns a pool of connections, so callers must not close it.
+    """
+    global _driver
+    if _driver is None:
+        with _driver_lock:
+            if _driver is None:
+                driver = GraphDatabase.driver(
+                    URI,
+                    auth=AUTH,
+                    max_connection_pool_size=MAX_POOL_SIZE,
+                    max_connection_lifetime=MAX_CONNECTION_LIFETIME,
+                    connection_acquisition_timeout=CONNECTION_ACQUISITION_TIMEOUT,
+                )
+                try:
+                    driver.verify_connectivity()
+                    print("Connection established")
+                except Exception as e:
+                    print(f"Error verifying driver connection: {e}")
+                _driver = driver
+    return _driver
+
+def close_driver():
+    """
+    Closes the process-wide driver and its pooled connections. Runs automatically at exit.
+    """
+    global _driver
+    with _driver_lock:
+        if _driver is not None:
+            _driver.close()
+            _driver = None
+
+atexit.register(close_driver)
+
+def get_async_driver():
+    """
+    Returns the process-wide asyncio driver, creating it on first use. It must be used
+    from a single event loop and closed with close_async_driver() before the loop exits.
+    """
+    global _async_driver
+    if _async_driver is None:
+        _async_driver = AsyncGraphDatabase.driver(
+            URI,
+            auth=AUTH,
+            max_connection_pool_size=MAX_POOL_SIZE,
+            max_connection_lifetime=MAX_CONNECTION_LIFETIME,
+            connection_acquisition_timeout=CONNECTION_ACQUISITION_TIMEOUT,
+        )
+    return _async_driver
+
+async def close_async_driver():
+    global _async_driver
+    if _async_driver is not None:
+        await _async_driver.close()
+        _async_driver = None
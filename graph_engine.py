@@ -0,0 +1,558 @@
+# Read-optimized in-memory copy of the FOLLOWS graph, used when GRAPH_BACKEND=memory.
+# Users are interned to int32 ids in username order, so id order is username order and
+# every adjacency row is already sorted the way the Cypher queries sort their pages.
+# Committed writes arrive through change_log and are kept in small overlays on top of the
+# CSR arrays until the next compaction; a background reconciliation repairs any drift.
+import os
+import threading
+from bisect import bisect_right
+import numpy as np
+from change_log import change_log
+from models import PopularUser, Profile, ProfileDashboard, Recommendation, UserSummary
+from recommendations import (
+    DEFAULT_SCORING, RECOMMENDATION_MAX_FANOUT, RECOMMENDATION_MAX_FRIENDS, RECOMMENDATION_PAGE_SIZE, SCORING_METHODS,
+)
+
+# where the engine is loaded from: "neo4j" takes a snapshot of the database, "csv" reads the import files
+GRAPH_SOURCE = os.getenv("GRAPH_SOURCE", "neo4j")
+GRAPH_PROFILES = os.getenv("GRAPH_PROFILES", "profiles.csv")
+GRAPH_EDGES = os.getenv("GRAPH_EDGES", "edges.csv")
+# rows with pending changes, plus users created or renamed, before the overlays are folded back into the CSR arrays
+GRAPH_COMPACT_THRESHOLD = int(os.getenv("GRAPH_COMPACT_THRESHOLD", "10000"))
+# seconds between degree reconciliations against Neo4j; 0 disables them
+GRAPH_RECONCILE_INTERVAL = float(os.getenv("GRAPH_RECONCILE_INTERVAL", "300"))
+RECONCILE_PAGE_SIZE = 5000
+
+PROFILE_FIELDS = ("name", "username", "email", "bio", "location")
+MUTUAL_MODES = ("followedByBoth", "followingBoth", "mutualFollow")
+EMPTY_ROW = np.zeros(0, dtype=np.int64)
+
+def build_csr(rows, columns, n):
+    """
+    Returns (offsets, targets) so that targets[offsets[i]:offsets[i + 1]] are the sorted
+    columns of row i. offsets has n + 1 entries.
+    """
+    order = np.lexsort((columns, rows))
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=n), out=offsets[1:])
+    return offsets, columns[order].astype(np.int32)
+
+def get_degree_page(tx, after, limit):
+    """
+    Returns the next page of (username, followers, following), counted from the relationships.
+    """
+    query = """
+    MATCH (u:User)
+    WHERE u.username > $after
+    RETURN u.username AS username,
+        COUNT { (u)<-[:FOLLOWS]-() } AS followers,
+        COUNT { (u)-[:FOLLOWS]->() } AS following
+    ORDER BY u.username
+    LIMIT $limit
+    """
+    result = tx.run(query, after=after, limit=limit)
+    return [(record["username"], record["followers"], record["following"]) for record in result]
+
+def get_adjacency(tx, usernames):
+    """
+    Returns the profile fields and both neighbour lists of every given user.
+    """
+    query = """
+    UNWIND $usernames AS username
+    MATCH (u:User {username: username})
+    RETURN u {.name, .username, .email, .bio, .location} AS profile,
+        [(u)-[:FOLLOWS]->(f:User) | f.username] AS following,
+        [(u)<-[:FOLLOWS]-(f:User) | f.username] AS followers
+    """
+    result = tx.run(query, usernames=usernames)
+    return [(record["profile"], record["following"], record["followers"]) for record in result]
+
+class GraphEngine:
+    """
+    Compressed sparse row (CSR) adjacency for out-edges (following) and in-edges (followers),
+    plus the profile columns needed to build the query-layer models without Neo4j.
+    Answers the same operations as the Cypher queries in queries.py.
+    """
+
+    def __init__(self, profiles, sources, targets):
+        """
+        profiles maps each of PROFILE_FIELDS to a list of equal length; sources and targets are
+        positions in those lists. Duplicate edges and self-loops are dropped.
+        """
+        self._lock = threading.RLock()
+        self.changes_applied = 0
+        self.compactions = 0
+        self.reconciliations = 0
+        self.repaired_users = 0
+        self.reconcile_errors = 0
+        self._stop = threading.Event()
+        self._reconciler = None
+        self._build(profiles, sources, targets)
+
+    def _build(self, profiles, sources, targets):
+        usernames = np.asarray(profiles["username"], dtype=object)
+        order = np.argsort(usernames, kind="stable")
+        rank = np.empty(len(order), dtype=np.int64)
+        rank[order] = np.arange(len(order))
+
+        self.n = len(order)
+        self.usernames = usernames[order]
+        self.ids = {username: i for i, username in enumerate(self.usernames)}
+        self.columns = {field: np.asarray(profiles[field], dtype=object)[order].tolist() for field in PROFILE_FIELDS}
+
+        width = max(self.n, 1)
+        sources = rank[np.asarray(sources, dtype=np.int64)]
+        targets = rank[np.asarray(targets, dtype=np.int64)]
+        keys = np.unique(sources * width + targets)
+        sources, targets = keys // width, keys % width
+        keep = sources != targets
+        sources, targets = sources[keep], targets[keep]
+
+        self.out_offsets, self.out_targets = build_csr(sources, targets, self.n)
+        self.in_offsets, self.in_targets = build_csr(targets, sources, self.n)
+
+        # pending changes: row id -> set of neighbour ids added to / removed from the CSR row
+        self._added_out, self._removed_out = {}, {}
+        self._added_in, self._removed_in = {}, {}
+        # ids created or renamed since the last build; only rows containing one of them are out
+        # of username order, so only those rows need sorting by name until the next compaction
+        self._unordered = set()
+        self._unordered_ids = EMPTY_ROW
+
+    @classmethod
+    def from_csv(cls, profiles_path=GRAPH_PROFILES, edges_path=GRAPH_EDGES):
+        """
+        Loads profiles.csv and edges.csv in the format written by data.py and read by import_data.
+        """
+        import pandas as pd
+        profiles = pd.read_csv(profiles_path, usecols=["id", *PROFILE_FIELDS], keep_default_na=False)
+        edges = pd.read_csv(edges_path, usecols=["source", "target"])
+
+        index = pd.Index(profiles["id"])
+        sources = index.get_indexer(edges["source"])
+        targets = index.get_indexer(edges["target"])
+        # drop edges pointing at ids that are not in the profiles file
+        known = (sources >= 0) & (targets >= 0)
+        columns = {field: profiles[field].tolist() for field in PROFILE_FIELDS}
+        return cls(columns, sources[known], targets[known])
+
+    @classmethod
+    def from_neo4j(cls, fetch_size=10000):
+        """
+        Takes a consistent snapshot of every user and FOLLOWS relationship in one read transaction.
+        """
+        def snapshot(tx):
+            users = tx.run("MATCH (u:User) RETURN u.name AS name, u.username AS username, u.email AS email, u.bio AS bio, u.location AS location")
+            columns = {field: [] for field in PROFILE_FIELDS}
+            positions = {}
+            for record in users:
+                positions[record["username"]] = len(positions)
+                for field in PROFILE_FIELDS:
+                    columns[field].append(record[field])
+
+            edges = tx.run("MATCH (a:User)-[:FOLLOWS]->(b:User) RETURN a.username AS source, b.username AS target")
+            pairs = [(positions[record["source"]], positions[record["target"]]) for record in edges]
+            return columns, pairs
+
+        # imported here so an engine loaded from csv needs no database connection
+        from db_connection import get_driver
+        with get_driver().session(fetch_size=fetch_size) as session:
+            columns, pairs = session.execute_read(snapshot)
+        pairs = np.array(pairs, dtype=np.int64).reshape(-1, 2)
+        return cls(columns, pairs[:, 0], pairs[:, 1])
+
+    def index(self, username):
+        return self.ids.get(username)
+
+    def _row(self, offsets, targets, added, removed, i):
+        row = targets[offsets[i]:offsets[i + 1]] if i < self.n else EMPTY_ROW
+        if i in added or i in removed:
+            row = np.setdiff1d(row, np.fromiter(removed.get(i, ()), dtype=np.int64), assume_unique=True)
+            row = np.union1d(row, np.fromiter(added.get(i, ()), dtype=np.int64))
+        return row
+
+    def out_row(self, i):
+        return self._row(self.out_offsets, self.out_targets, self._added_out, self._removed_out, i)
+
+    def in_row(self, i):
+        return self._row(self.in_offsets, self.in_targets, self._added_in, self._removed_in, i)
+
+    def _mark_unordered(self, i):
+        if i not in self._unordered:
+            self._unordered.add(i)
+            self._unordered_ids = np.insert(self._unordered_ids, np.searchsorted(self._unordered_ids, i), i)
+
+    def is_ordered(self, row):
+        """
+        True when the id-sorted row holds no user created or renamed since the last build,
+        so its id order is still username order.
+        """
+        if len(self._unordered_ids) == 0 or len(row) == 0:
+            return True
+        k = np.minimum(np.searchsorted(row, self._unordered_ids), len(row) - 1)
+        return not (row[k] == self._unordered_ids).any()
+
+    def in_username_order(self, row):
+        """
+        Rows are sorted by id, which is username order unless the row holds a renamed or new user.
+        """
+        if self.is_ordered(row):
+            return row
+        names = self.columns["username"]
+        return np.array(sorted(row, key=names.__getitem__), dtype=np.int64)
+
+    def neighbours(self, i):
+        """
+        Users connected to i in either direction, in id order.
+        """
+        return np.union1d(self.out_row(i), self.in_row(i))
+
+    def degree(self, i):
+        return len(self.out_row(i)) + len(self.in_row(i))
+
+    def summary(self, i):
+        return UserSummary(self.columns["name"][i], self.columns["username"][i])
+
+    def summaries(self, ids):
+        return [self.summary(i) for i in ids]
+
+    def page_after(self, row, after, limit):
+        """
+        Keyset page of a row: the first limit ids whose username is greater than after.
+        """
+        if self.is_ordered(row):
+            first = np.searchsorted(self.usernames, after, side="right")
+            start = np.searchsorted(row, first)
+        else:
+            row = self.in_username_order(row)
+            start = bisect_right(row, after, key=self.columns["username"].__getitem__)
+        return row[start:] if limit is None else row[start:start + limit]
+
+    def profile(self, username):
+        with self._lock:
+            i = self.index(username)
+            if i is None:
+                return None
+            return Profile(**{field: self.columns[field][i] for field in PROFILE_FIELDS})
+
+    def following(self, username, after="", limit=None):
+        with self._lock:
+            i = self.index(username)
+            if i is None:
+                return []
+            return self.summaries(self.page_after(self.out_row(i), after, limit))
+
+    def followers(self, username, after="", limit=None):
+        with self._lock:
+            i = self.index(username)
+            if i is None:
+                return []
+            return self.summaries(self.page_after(self.in_row(i), after, limit))
+
+    def dashboard(self, username, list_limit):
+        with self._lock:
+            i = self.index(username)
+            if i is None:
+                return None
+            followers = self.in_username_order(self.in_row(i))
+            following = self.in_username_order(self.out_row(i))
+            return ProfileDashboard(
+                profile=self.profile(username),
+                followersCount=len(followers),
+                followingCount=len(following),
+                followers=self.summaries(followers[:list_limit]),
+                following=self.summaries(following[:list_limit]),
+            )
+
+    def mutuals(self, current_username, friend_username, mode="followedByBoth", skip=0, limit=None):
+        """
+        Returns (total, page) like queries.get_mutuals, for the same three modes.
+        """
+        with self._lock:
+            a, b = self.index(current_username), self.index(friend_username)
+            if a is None or b is None:
+                return 0, []
+
+            if mode == "followedByBoth":
+                mutual = np.intersect1d(self.out_row(a), self.out_row(b), assume_unique=True)
+            elif mode == "followingBoth":
+                mutual = np.intersect1d(self.in_row(a), self.in_row(b), assume_unique=True)
+            elif mode == "mutualFollow":
+                followed = np.intersect1d(self.out_row(a), self.out_row(b), assume_unique=True)
+                following = np.intersect1d(self.in_row(a), self.in_row(b), assume_unique=True)
+                mutual = np.intersect1d(followed, following, assume_unique=True)
+            else:
+                raise ValueError(f"Unknown mutuals mode '{mode}', expected one of {MUTUAL_MODES}")
+
+            mutual = self.in_username_order(mutual)
+            end = None if limit is None else skip + limit
+            return len(mutual), self.summaries(mutual[skip:end])
+
+    def recommendations(self, username, skip=0, limit=RECOMMENDATION_PAGE_SIZE, scoring=DEFAULT_SCORING,
+                        max_friends=RECOMMENDATION_MAX_FRIENDS, max_fanout=RECOMMENDATION_MAX_FANOUT):
+        """
+        Friend-of-friend suggestions scored like recommendations.SCORED_SUGGESTIONS,
+        with the same per-hop fan-out caps.
+        """
+        if scoring not in SCORING_METHODS:
+            raise ValueError(f"Unknown scoring method '{scoring}', expected one of {SCORING_METHODS}")
+
+        with self._lock:
+            me = self.index(username)
+            if me is None:
+                return []
+
+            neighbours = self.neighbours(me)
+            candidates = []
+            weights = []
+            for friend in neighbours[:max_friends]:
+                reached = self.neighbours(friend)[:max_fanout]
+                candidates.append(reached)
+                weights.append(np.full(len(reached), 1.0 / np.log(max(self.degree(friend), 2))))
+            if not candidates:
+                return []
+
+            candidates = np.concatenate(candidates)
+            weights = np.concatenate(weights)
+            keep = (candidates != me) & ~np.isin(candidates, neighbours)
+            suggestions, inverse = np.unique(candidates[keep], return_inverse=True)
+            if len(suggestions) == 0:
+                return []
+
+            mutual_counts = np.bincount(inverse, minlength=len(suggestions))
+            if scoring == "mutual":
+                scores = mutual_counts.astype(np.float64)
+            else:
+                scores = np.bincount(inverse, weights=weights[keep], minlength=len(suggestions))
+
+            # best score first, ties by username
+            if self.is_ordered(suggestions):
+                order = np.lexsort((suggestions, -scores))
+            else:
+                names = self.columns["username"]
+                order = sorted(range(len(suggestions)), key=lambda k: (-scores[k], names[suggestions[k]]))
+            return [
+                Recommendation(
+                    name=self.columns["name"][suggestions[k]],
+                    username=self.columns["username"][suggestions[k]],
+                    bio=self.columns["bio"][suggestions[k]],
+                    mutualConnections=int(mutual_counts[k]),
+                    score=float(scores[k]),
+                )
+                for k in order[skip:skip + limit]
+            ]
+
+    def most_followed(self, limit=10):
+        with self._lock:
+            size = len(self.columns["username"])
+            followers = np.zeros(size, dtype=np.int64)
+            followers[:self.n] = np.diff(self.in_offsets)
+            for i, added in self._added_in.items():
+                followers[i] += len(added)
+            for i, removed in self._removed_in.items():
+                followers[i] -= len(removed)
+
+            limit = min(limit, size)
+            if limit == 0:
+                return []
+            top = np.argpartition(-followers, limit - 1)[:limit]
+            top = top[np.lexsort((top, -followers[top]))]
+            return [
+                PopularUser(
+                    name=self.columns["name"][i],
+                    username=self.columns["username"][i],
+                    bio=self.columns["bio"][i],
+                    location=self.columns["location"][i],
+                    followersCount=int(followers[i]),
+                )
+                for i in top
+            ]
+
+    def _has_base_edge(self, a, b):
+        if a >= self.n or b >= self.n:
+            return False
+        row = self.out_targets[self.out_offsets[a]:self.out_offsets[a + 1]]
+        k = np.searchsorted(row, b)
+        return k < len(row) and row[k] == b
+
+    def _set_edge(self, a, b, present):
+        """
+        Makes a -> b present or absent through the overlays. Applying the same change twice is a no-op.
+        """
+        in_base = self._has_base_edge(a, b)
+        for row, other, added, removed in ((a, b, self._added_out, self._removed_out),
+                                           (b, a, self._added_in, self._removed_in)):
+            if present == in_base:
+                removed.get(row, set()).discard(other)
+                added.get(row, set()).discard(other)
+            elif present:
+                added.setdefault(row, set()).add(other)
+            else:
+                removed.setdefault(row, set()).add(other)
+            for pending in (added, removed):
+                if row in pending and not pending[row]:
+                    del pending[row]
+
+    def _add_user(self, fields):
+        if fields["username"] in self.ids:
+            return self.ids[fields["username"]]
+        i = len(self.columns["username"])
+        for field in PROFILE_FIELDS:
+            self.columns[field].append(fields.get(field))
+        self.ids[fields["username"]] = i
+        self._mark_unordered(i)
+        return i
+
+    def apply(self, event):
+        """
+        Applies a change_log event. Events about users the engine does not know are ignored;
+        reconciliation picks those users up.
+        """
+        with self._lock:
+            if event.kind == "create":
+                self._add_user(event.fields)
+            elif event.kind == "rename":
+                i = self.ids.pop(event.username, None)
+                if i is not None:
+                    self.columns["username"][i] = event.target
+                    self.ids[event.target] = i
+                    self._mark_unordered(i)
+            elif event.kind == "update":
+                i = self.index(event.username)
+                if i is not None:
+                    for field, value in event.fields.items():
+                        if field in PROFILE_FIELDS and field != "username":
+                            self.columns[field][i] = value
+            else:
+                a, b = self.index(event.username), self.index(event.target)
+                if a is not None and b is not None and a != b:
+                    self._set_edge(a, b, present=event.kind == "follow")
+
+            self.changes_applied += 1
+            if self.pending_rows() > GRAPH_COMPACT_THRESHOLD:
+                self.compact()
+
+    def pending_rows(self):
+        return len(self._added_out) + len(self._removed_out) + len(self._unordered)
+
+    def compact(self):
+        """
+        Folds the pending changes, renames and new users back into fresh CSR arrays.
+        """
+        with self._lock:
+            size = len(self.columns["username"])
+            sources = np.repeat(np.arange(self.n, dtype=np.int64), np.diff(self.out_offsets))
+            targets = self.out_targets.astype(np.int64)
+
+            removed = [(a, b) for a, row in self._removed_out.items() for b in row]
+            if removed:
+                removed = np.array(removed, dtype=np.int64)
+                keep = ~np.isin(sources * size + targets, removed[:, 0] * size + removed[:, 1])
+                sources, targets = sources[keep], targets[keep]
+
+            added = [(a, b) for a, row in self._added_out.items() for b in row]
+            if added:
+                added = np.array(added, dtype=np.int64)
+                sources = np.concatenate((sources, added[:, 0]))
+                targets = np.concatenate((targets, added[:, 1]))
+
+            self._build(self.columns, sources, targets)
+            self.compactions += 1
+
+    def _reset_user(self, i, following, followers):
+        """
+        Sets the neighbours of user i to the username lists read from the database.
+        """
+        for names, row, outgoing in ((following, self.out_row(i), True), (followers, self.in_row(i), False)):
+            wanted = {self.ids[name] for name in names if name in self.ids}
+            current = set(row.tolist())
+            for j in wanted ^ current:
+                a, b = (i, j) if outgoing else (j, i)
+                self._set_edge(a, b, present=j in wanted)
+
+    def reconcile(self, page_size=RECONCILE_PAGE_SIZE):
+        """
+        Compares every user's follower and following counts with the relationships in Neo4j and
+        reloads the adjacency of users that drifted or are missing, e.g. after a missed event or
+        a write made by another process. Returns the number of users repaired.
+        """
+        from db_connection import get_driver
+        drifted = []
+        after = ""
+        with get_driver().session() as session:
+            while True:
+                page = session.execute_read(get_degree_page, after, page_size)
+                with self._lock:
+                    for username, followers, following in page:
+                        i = self.index(username)
+                        if i is None or len(self.in_row(i)) != followers or len(self.out_row(i)) != following:
+                            drifted.append(username)
+                if len(page) < page_size:
+                    break
+                after = page[-1][0]
+
+            for start in range(0, len(drifted), page_size):
+                rows = session.execute_read(get_adjacency, drifted[start:start + page_size])
+                with self._lock:
+                    # add every missing user first so the edges between them can be restored
+                    ids = [self._add_user(profile) for profile, _, _ in rows]
+                    for i, (_, following, followers) in zip(ids, rows):
+                        self._reset_user(i, following, followers)
+
+        with self._lock:
+            self.reconciliations += 1
+            self.repaired_users += len(drifted)
+            if drifted:
+                self.compact()
+        return len(drifted)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "users": len(self.columns["username"]),
+                "pending_rows": self.pending_rows(),
+                "changes_applied": self.changes_applied,
+                "compactions": self.compactions,
+                "reconciliations": self.reconciliations,
+                "repaired_users": self.repaired_users,
+                "reconcile_errors": self.reconcile_errors,
+            }
+
+    def start_reconciler(self, interval=GRAPH_RECONCILE_INTERVAL):
+        if interval <= 0 or self._reconciler is not None:
+            return
+        self._reconciler = threading.Thread(target=self._reconcile_loop, args=(interval,), daemon=True)
+        self._reconciler.start()
+
+    def _reconcile_loop(self, interval):
+        while not self._stop.wait(interval):
+            try:
+                self.reconcile()
+            except Exception:
+                # keep serving from memory; the next run retries
+                self.reconcile_errors += 1
+
+    def close(self):
+        self._stop.set()
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine():
+    """
+    Returns the process-wide engine, loading it from GRAPH_SOURCE on first use. The engine
+    subscribes to change_log, replaying any change committed while its snapshot was loading.
+    """
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                loaded_after = change_log.sequence
+                if GRAPH_SOURCE == "csv":
+                    engine = GraphEngine.from_csv()
+                else:
+                    engine = GraphEngine.from_neo4j()
+                change_log.subscribe(engine.apply, replay_after=loaded_after)
+                engine.start_reconciler()
+                _engine = engine
+    return _engine
@@ -0,0 +1,152 @@
+# Vectorized synthetic FOLLOWS graph generator for load tests (replaces the per-user loop in data.py)
+import argparse
+import time
+import numpy as np
+import pandas as pd
+from helpers import print_success
+
+DEGREE_DISTRIBUTIONS = ("uniform", "powerlaw", "community")
+# sources per batch; each batch is sampled, deduplicated and written before the next one
+CHUNK_USERS = 1_000_000
+
+def sample_degrees(rng, size, distribution, min_degree, max_degree, alpha):
+    """
+    Returns the number of accounts each of size users follows.
+    uniform and community draw min_degree..max_degree; powerlaw draws a Pareto tail.
+    """
+    if distribution == "powerlaw":
+        degrees = np.floor(min_degree * (1 + rng.pareto(alpha - 1, size)))
+        return np.minimum(degrees, max_degree).astype(np.int64)
+    return rng.integers(min_degree, max_degree + 1, size=size)
+
+def popularity_weights(rng, n_users, alpha):
+    """
+    Cumulative preferential-attachment weights, so a few users collect most followers.
+    """
+    cum_weights = np.cumsum(1 + rng.pareto(alpha - 1, n_users))
+    return cum_weights / cum_weights[-1]
+
+def sample_targets(rng, sources, n_users, distribution, cum_weights, community_size, p_within):
+    size = len(sources)
+    if distribution == "powerlaw":
+        return np.searchsorted(cum_weights, rng.random(size), side="right").clip(max=n_users - 1)
+
+    if distribution == "community":
+        # p_within of the follows stay inside the source's block of community_size consecutive ids
+        start = (sources // community_size) * community_size
+        span = np.minimum(start + community_size, n_users) - start
+        within = (rng.random(size) < p_within) & (span > 1)
+        local = start + (rng.random(size) * (span - 1)).astype(np.int64)
+        targets = np.where(within, local, rng.integers(0, n_users - 1, size=size))
+        return targets + (targets >= sources)
+
+    # draw from n_users - 1 ids and shift past the source, so no self-loops are drawn at all
+    targets = rng.integers(0, n_users - 1, size=size)
+    return targets + (targets >= sources)
+
+def generate_edge_chunks(n_users, distribution="uniform", min_degree=3, max_degree=6, alpha=2.1,
+                         community_size=1000, p_within=0.8, directed=True, seed=None, chunk_users=CHUNK_USERS):
+    """
+    Yields int64 arrays of shape (k, 2) holding (source, target) indices in 0..n_users-1.
+    Edges are sampled in batches of chunk_users sources without building per-user candidate
+    lists, and duplicates are removed by sorting packed source*n_users+target keys.
+    Undirected graphs store each pair once as (min, max); since the same pair can be drawn
+    from both ends in different batches, the keys are deduplicated globally before yielding.
+    """
+    if distribution not in DEGREE_DISTRIBUTIONS:
+        raise ValueError(f"Unknown degree distribution '{distribution}', expected one of {DEGREE_DISTRIBUTIONS}")
+    if n_users < 2:
+        return
+
+    rng = np.random.default_rng(seed)
+    max_degree = min(max_degree, n_users - 1)
+    cum_weights = popularity_weights(rng, n_users, alpha) if distribution == "powerlaw" else None
+    community_size = max(min(community_size, n_users), 2)
+
+    undirected_keys = []
+    for first in range(0, n_users, chunk_users):
+        ids = np.arange(first, min(first + chunk_users, n_users), dtype=np.int64)
+        degrees = sample_degrees(rng, len(ids), distribution, min_degree, max_degree, alpha)
+        sources = np.repeat(ids, degrees)
+        targets = sample_targets(rng, sources, n_users, distribution, cum_weights, community_size, p_within)
+
+        if not directed:
+            sources, targets = np.minimum(sources, targets), np.maximum(sources, targets)
+        keys = sources * n_users + targets
+        # weighted sampling can still pick the source itself
+        keys = keys[sources != targets]
+
+        if directed:
+            # every batch owns its sources, so duplicates can only occur inside the batch
+            keys = np.unique(keys)
+            yield np.column_stack((keys // n_users, keys % n_users))
+        else:
+            undirected_keys.append(keys)
+
+    if not directed and undirected_keys:
+        keys = np.unique(np.concatenate(undirected_keys))
+        for first in range(0, len(keys), chunk_users):
+            chunk = keys[first:first + chunk_users]
+            yield np.column_stack((chunk // n_users, chunk % n_users))
+
+def write_edges(chunks, path, file_format="csv", ids=None, id_offset=0):
+    """
+    Streams edge chunks to a CSV or Parquet file with source/target columns and returns the edge count.
+    Indices are mapped through the ids array when given, otherwise shifted by id_offset.
+    """
+    if file_format == "parquet":
+        # pyarrow is only needed for Parquet output, see requirements-optional.txt
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+    total = 0
+    writer = None
+    try:
+        with open(path, "w", newline="", encoding="utf-8") if file_format == "csv" else open(path, "wb") as f:
+            for chunk in chunks:
+                edges = ids[chunk] if ids is not None else chunk + id_offset
+                df = pd.DataFrame(edges, columns=["source", "target"])
+                if file_format == "csv":
+                    df.to_csv(f, header=total == 0, index=False)
+                else:
+                    table = pa.Table.from_pandas(df, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(f, table.schema)
+                    writer.write_table(table)
+                total += len(edges)
+            if file_format == "csv" and total == 0:
+                f.write("source,target\n")
+    finally:
+        if writer is not None:
+            writer.close()
+    return total
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate a synthetic FOLLOWS edge list.")
+    parser.add_argument("--users", type=int, help="number of users (default: one per row of --profiles)")
+    parser.add_argument("--profiles", default="profiles.csv", help="use the ids of this profiles file")
+    parser.add_argument("--distribution", choices=DEGREE_DISTRIBUTIONS, default="uniform")
+    parser.add_argument("--min-degree", type=int, default=3)
+    parser.add_argument("--max-degree", type=int, default=6)
+    parser.add_argument("--alpha", type=float, default=2.1, help="power-law exponent")
+    parser.add_argument("--community-size", type=int, default=1000)
+    parser.add_argument("--p-within", type=float, default=0.8, help="share of follows inside the community")
+    parser.add_argument("--undirected", action="store_true", help="store each pair once, like data.create_connections")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--chunk-users", type=int, default=CHUNK_USERS)
+    parser.add_argument("--format", choices=("csv", "parquet"), default="csv")
+    parser.add_argument("--output", default="edges.csv")
+    args = parser.parse_args()
+
+    ids = None
+    n_users = args.users
+    if n_users is None:
+        ids = pd.read_csv(args.profiles, usecols=["id"])["id"].to_numpy()
+        n_users = len(ids)
+
+    start = time.perf_counter()
+    chunks = generate_edge_chunks(n_users, args.distribution, args.min_degree, args.max_degree, args.alpha,
+                                  args.community_size, args.p_within, not args.undirected, args.seed, args.chunk_users)
+    total = write_edges(chunks, args.output, args.format, ids)
+    elapsed = time.perf_counter() - start
+    print_success(f"Wrote {total} edges for {n_users} users to {args.output} in {elapsed:.2f}s ({total / max(elapsed, 1e-9):,.0f} edges/sec)")
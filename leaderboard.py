@@ -0,0 +1,147 @@
+# In-process cache for results that are the same for every user, e.g. the popular users list
+import os
+import threading
+import time
+
+LEADERBOARD_TTL = float(os.getenv("LEADERBOARD_TTL", "30"))
+LEADERBOARD_STALE_TTL = float(os.getenv("LEADERBOARD_STALE_TTL", "300"))
+
+class LeaderboardCache:
+    """
+    Caches the result of fetch() for ttl seconds. Once expired, the old value is still
+    served for up to stale_ttl more seconds while a background thread fetches a new one
+    (stale-while-revalidate). A daemon thread also refreshes the value every
+    refresh_interval seconds so reads normally never wait on the database.
+    """
+
+    def __init__(self, fetch, ttl=LEADERBOARD_TTL, stale_ttl=LEADERBOARD_STALE_TTL, refresh_interval=None):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.refresh_interval = refresh_interval if refresh_interval is not None else ttl * 0.8
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refreshes = 0
+        self.refresh_errors = 0
+
+        self._value = None
+        self._loaded_at = None
+        # bumped by invalidate(), so a fetch that was already running can tell its result is stale
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._refreshing = False
+        self._refresher = None
+        self._stop = threading.Event()
+
+    def get(self):
+        """
+        Returns the cached value, fetching it synchronously only when nothing usable is cached.
+        """
+        self._start_refresher()
+        with self._lock:
+            age = None if self._loaded_at is None else time.monotonic() - self._loaded_at
+            if age is not None and age < self.ttl:
+                self.hits += 1
+                return self._value
+            if age is not None and age < self.ttl + self.stale_ttl:
+                self.stale_hits += 1
+                value = self._value
+            else:
+                self.misses += 1
+                value = None
+
+        if value is not None:
+            self._refresh_in_background()
+            return value
+        return self.refresh()
+
+    def refresh(self):
+        """
+        Fetches a new value and stores it. Raises if fetch() fails. A value fetched while
+        invalidate() was called is stored as already expired.
+        """
+        value, _ = self._load()
+        return value
+
+    def invalidate(self):
+        """
+        Marks the cached value as expired and starts fetching a new one in the background.
+        A refresh already in flight is fetched again once it finishes. Does nothing else until
+        a value has been loaded, so processes that never read it never fetch it.
+        """
+        with self._lock:
+            self._generation += 1
+            if self._loaded_at is None:
+                return
+            self._loaded_at = time.monotonic() - self.ttl
+        self._refresh_in_background()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.stale_hits + self.misses
+            return {
+                "hits": self.hits,
+                "stale_hits": self.stale_hits,
+                "misses": self.misses,
+                "hit_rate": (self.hits + self.stale_hits) / lookups if lookups else 0.0,
+                "refreshes": self.refreshes,
+                "refresh_errors": self.refresh_errors,
+            }
+
+    def close(self):
+        self._stop.set()
+
+    def _claim_refresh(self):
+        # only one refresh runs at a time
+        with self._lock:
+            if self._refreshing:
+                return False
+            self._refreshing = True
+            return True
+
+    def _load(self):
+        # returns (value, current); current is False when invalidate() ran during the fetch
+        with self._lock:
+            generation = self._generation
+        value = self.fetch()
+        with self._lock:
+            current = generation == self._generation
+            self._value = value
+            self._loaded_at = time.monotonic() if current else time.monotonic() - self.ttl
+            self.refreshes += 1
+        return value, current
+
+    def _refresh_in_background(self):
+        if self._claim_refresh():
+            threading.Thread(target=self._safe_refresh, daemon=True).start()
+
+    def _safe_refresh(self):
+        try:
+            # fetch again until no invalidate() lands during the fetch
+            while not self._load()[1]:
+                pass
+        except Exception:
+            # keep serving the previous value; the next read or tick retries
+            with self._lock:
+                self.refresh_errors += 1
+        finally:
+            with self._lock:
+                self._refreshing = False
+
+    def _start_refresher(self):
+        if self._refresher is not None or self.refresh_interval <= 0:
+            return
+        with self._lock:
+            if self._refresher is not None:
+                return
+            self._refresher = threading.Thread(target=self._refresh_loop, daemon=True)
+        self._refresher.start()
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            with self._lock:
+                loaded = self._loaded_at is not None
+            if loaded and self._claim_refresh():
+                self._safe_refresh()
@@ -0,0 +1,136 @@
+# Maintenance commands for denormalized data kept on the User nodes
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from db_connection import get_driver
+from helpers import print_success
+from recommendations import DEFAULT_SCORING, SCORED_SUGGESTIONS, scoring_params
+
+REPAIR_BATCH_SIZE = 10000
+
+# Recommendation refresh job: users per transaction, parallel transactions, suggestions kept per user
+RECOMMENDATION_CHUNK_SIZE = 500
+RECOMMENDATION_WORKERS = 4
+RECOMMENDATION_STORE_SIZE = 50
+
+def execute_repair_follow_counts(batch_size=REPAIR_BATCH_SIZE):
+    """
+    Recomputes followersCount/followingCount for every user from the FOLLOWS relationships,
+    committing every batch_size users. Returns the number of users updated.
+    """
+    # CALL { } IN TRANSACTIONS can only run in an auto-commit transaction, so use session.run
+    query = """
+    MATCH (u:User)
+    CALL {
+        WITH u
+        SET u.followersCount = COUNT { (u)<-[:FOLLOWS]-(:User) },
+            u.followingCount = COUNT { (u)-[:FOLLOWS]->(:User) }
+    } IN TRANSACTIONS OF $batch_size ROWS
+    """
+    driver = get_driver()
+    with driver.session() as session:
+        summary = session.run(query, batch_size=batch_size).consume()
+        return summary.counters.properties_set // 2
+
+def get_server_time(tx):
+    """
+    Returns the database clock, the one graphChangedAt is written with.
+    """
+    return tx.run("RETURN datetime() AS now").single()["now"]
+
+def get_recommendation_users(tx, after, limit, full):
+    """
+    Returns the next page of usernames (ordered, after the given one) whose stored
+    recommendations are missing or stale. A user is stale when an edge of theirs or of
+    one of their neighbours changed since the last run, i.e. their 2-hop neighbourhood changed.
+    """
+    query = """
+    MATCH (u:User)
+    WHERE u.username > $after
+    AND ($full
+        OR u.recommendationsComputedAt IS NULL
+        OR u.graphChangedAt > u.recommendationsComputedAt
+        OR EXISTS {
+            MATCH (u)-[:FOLLOWS]-(n:User)
+            WHERE n.graphChangedAt > u.recommendationsComputedAt
+        })
+    RETURN u.username AS username
+    ORDER BY u.username
+    LIMIT $limit
+    """
+    result = tx.run(query, after=after, limit=limit, full=full)
+    return [record["username"] for record in result]
+
+def store_recommendations(tx, usernames, started_at, store_size):
+    """
+    Replaces the RECOMMENDED relationships of every given user with their current top suggestions.
+    """
+    query = """
+    UNWIND $usernames AS username
+    MATCH (me:User {username: username})
+    CALL {
+        WITH me
+        MATCH (me)-[old:RECOMMENDED]->()
+        DELETE old
+    }
+    SET me.recommendationsComputedAt = $started_at
+    WITH me
+    """ + SCORED_SUGGESTIONS + """
+    CREATE (me)-[:RECOMMENDED {score: score, mutualConnections: mutualConnections}]->(suggestion)
+    """
+    params = scoring_params(DEFAULT_SCORING, skip=0, limit=store_size)
+    tx.run(query, usernames=usernames, started_at=started_at, **params).consume()
+
+def execute_refresh_recommendations(full=False, chunk_size=RECOMMENDATION_CHUNK_SIZE,
+                                    workers=RECOMMENDATION_WORKERS, store_size=RECOMMENDATION_STORE_SIZE):
+    """
+    Precomputes the top store_size suggestions for every user (full=True) or only for users whose
+    2-hop neighbourhood changed since the last run, writing chunks in parallel transactions.
+    Returns the number of users refreshed.
+    """
+    start = time.perf_counter()
+    driver = get_driver()
+    # changes committed while the job runs are newer than this and get picked up next run; taken
+    # from the server so it is compared with graphChangedAt on the same clock
+    with driver.session() as session:
+        started_at = session.execute_read(get_server_time)
+
+    def refresh_chunk(usernames):
+        with driver.session() as session:
+            session.execute_write(store_recommendations, usernames, started_at, store_size)
+        return len(usernames)
+
+    refreshed = 0
+    after = ""
+    with ThreadPoolExecutor(max_workers=workers) as executor, driver.session() as session:
+        futures = []
+        while True:
+            usernames = session.execute_read(get_recommendation_users, after, chunk_size, full)
+            if not usernames:
+                break
+            after = usernames[-1]
+            futures.append(executor.submit(refresh_chunk, usernames))
+        for future in futures:
+            refreshed += future.result()
+
+    elapsed = time.perf_counter() - start
+    print_success(f"Refreshed recommendations for {refreshed} users in {elapsed:.2f}s")
+    return refreshed
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintenance commands for the social network database.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    repair = subparsers.add_parser("repair-counts", help="recompute followersCount/followingCount from the graph")
+    repair.add_argument("--batch-size", type=int, default=REPAIR_BATCH_SIZE)
+    refresh = subparsers.add_parser("refresh-recommendations", help="precompute stored friend recommendations")
+    refresh.add_argument("--full", action="store_true", help="recompute every user instead of only changed ones")
+    refresh.add_argument("--chunk-size", type=int, default=RECOMMENDATION_CHUNK_SIZE)
+    refresh.add_argument("--workers", type=int, default=RECOMMENDATION_WORKERS)
+    refresh.add_argument("--store-size", type=int, default=RECOMMENDATION_STORE_SIZE)
+    args = parser.parse_args()
+
+    if args.command == "repair-counts":
+        updated = execute_repair_follow_counts(args.batch_size)
+        print_success(f"Recomputed follow counters for {updated} users.")
+    elif args.command == "refresh-recommendations":
+        execute_refresh_recommendations(args.full, args.chunk_size, args.workers, args.store_size)
@@ -0,0 +1,57 @@
+# Lightweight result types for each view. Queries return only the fields listed here,
+# using Cypher map projections built by projection(), instead of whole User nodes.
+from typing import NamedTuple, Optional
+
+class UserSummary(NamedTuple):
+    name: str
+    username: str
+
+class Profile(NamedTuple):
+    name: str
+    username: str
+    email: str
+    bio: Optional[str] = None
+    location: Optional[str] = None
+
+class SearchResult(NamedTuple):
+    name: str
+    username: str
+    bio: Optional[str]
+    location: Optional[str]
+    score: float
+
+class Recommendation(NamedTuple):
+    name: str
+    username: str
+    bio: Optional[str]
+    mutualConnections: int
+    score: float
+
+class PopularUser(NamedTuple):
+    name: str
+    username: str
+    bio: Optional[str]
+    location: Optional[str]
+    followersCount: int
+
+class ProfileDashboard(NamedTuple):
+    profile: Profile
+    followersCount: int
+    followingCount: int
+    followers: list
+    following: list
+
+def projection(model, variable, **computed):
+    """
+    Returns a Cypher map projection with the model's fields, e.g. projection(UserSummary, "u")
+    gives "u {.name, .username}". Fields that are not node properties are passed as
+    field=cypher_expression.
+    """
+    fields = [f"{field}: {computed[field]}" if field in computed else f".{field}" for field in model._fields]
+    return variable + " {" + ", ".join(fields) + "}"
+
+def from_map(model, value):
+    """
+    Builds the model from a projected map, or returns None for a null result.
+    """
+    return model(**value) if value is not None else None
@@ -0,0 +1,152 @@
+# Bounded in-process cache of Profile results, addressable by username and by email
+import os
+import threading
+import time
+from collections import OrderedDict
+
+PROFILE_CACHE_SIZE = int(os.getenv("PROFILE_CACHE_SIZE", "10000"))
+PROFILE_CACHE_TTL = float(os.getenv("PROFILE_CACHE_TTL", "60"))
+
+class ProfileCache:
+    """
+    LRU cache of Profiles keyed by username, with a secondary email index. Entries expire
+    after ttl seconds and the least recently used entry is evicted beyond max_size.
+    fetch_many(usernames) returns Profiles for the users that exist; fetch_by_email(email)
+    returns one Profile or None. Subscribe apply() to change_log to follow renames and updates.
+    """
+
+    def __init__(self, fetch_many, fetch_by_email, max_size=PROFILE_CACHE_SIZE, ttl=PROFILE_CACHE_TTL):
+        self.fetch_many = fetch_many
+        self.fetch_by_email = fetch_by_email
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+        # username -> (profile, expires_at), least recently used first
+        self._entries = OrderedDict()
+        self._emails = {}
+        self._lock = threading.Lock()
+
+    def _lookup(self, username, now):
+        entry = self._entries.get(username)
+        if entry is None:
+            return None
+        profile, expires_at = entry
+        if expires_at <= now:
+            self._remove(username)
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(username)
+        return profile
+
+    def _remove(self, username):
+        entry = self._entries.pop(username, None)
+        if entry is not None and self._emails.get(entry[0].email) == username:
+            del self._emails[entry[0].email]
+
+    def put(self, profile):
+        """
+        Caches a Profile that was just read, e.g. the one returned by login.
+        """
+        if profile is None or self.max_size <= 0:
+            return
+        with self._lock:
+            self._remove(profile.username)
+            self._entries[profile.username] = (profile, time.monotonic() + self.ttl)
+            self._emails[profile.email] = profile.username
+            while len(self._entries) > self.max_size:
+                username, (evicted, _) = self._entries.popitem(last=False)
+                if self._emails.get(evicted.email) == username:
+                    del self._emails[evicted.email]
+                self.evictions += 1
+
+    def cached(self, username):
+        """
+        Returns the user's cached Profile, or None on a miss; never calls fetch_many. Lets callers
+        that read the database their own way, e.g. async_queries, share the cache.
+        """
+        with self._lock:
+            profile = self._lookup(username, time.monotonic())
+            if profile is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return profile
+
+    def get(self, username):
+        """
+        Returns the user's Profile, or None if there is no such user.
+        """
+        return self.get_many([username]).get(username)
+
+    def get_many(self, usernames):
+        """
+        Returns {username: Profile} for every given user that exists. Cached entries are served
+        from memory and all the misses are fetched together in one call to fetch_many.
+        """
+        found = {}
+        missing = []
+        now = time.monotonic()
+        with self._lock:
+            for username in dict.fromkeys(usernames):
+                profile = self._lookup(username, now)
+                if profile is None:
+                    missing.append(username)
+                else:
+                    found[username] = profile
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        if missing:
+            for profile in self.fetch_many(missing):
+                self.put(profile)
+                found[profile.username] = profile
+        return found
+
+    def get_by_email(self, email):
+        with self._lock:
+            username = self._emails.get(email)
+            profile = self._lookup(username, time.monotonic()) if username is not None else None
+            if profile is not None:
+                self.hits += 1
+                return profile
+            self.misses += 1
+
+        profile = self.fetch_by_email(email)
+        self.put(profile)
+        return profile
+
+    def invalidate(self, username):
+        with self._lock:
+            self._remove(username)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._emails.clear()
+
+    def apply(self, event):
+        """
+        change_log subscriber: drops entries whose profile fields changed. A rename drops the
+        entry under the old username; the new one is fetched on its next read.
+        """
+        if event.kind in ("rename", "update", "create"):
+            self.invalidate(event.username)
+            if event.target is not None:
+                self.invalidate(event.target)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+            }
@@ -1,188 +1,410 @@
+# Data-access layer: every execute_* function runs its transaction and returns structured results.
+# Nothing here prints; the terminal rendering lives in views.py.
+import os
+from change_log import change_log
+from credentials import check_password, hash_password, hash_passwords, sessions
 from db_connection import get_driver
 from neo4j import exceptions
-from helpers import blue_text, orange_text, bold_underline, print_error, print_success
+from leaderboard import LeaderboardCache
+from profile_cache import ProfileCache
+from models import PopularUser, Profile, ProfileDashboard, Recommendation, SearchResult, UserSummary, from_map, projection
+from recommendations import DEFAULT_SCORING, RECOMMENDATION_PAGE_SIZE, SCORED_SUGGESTIONS, scoring_params
+from search import SEARCH_INDEX, SEARCH_PAGE_SIZE, build_fulltext_query
+
+def read(tx_function, *args, **kwargs):
+    """
+    Runs a read transaction function in a session from the shared driver and returns its result.
+    """
+    with get_driver().session() as session:
+        return session.execute_read(tx_function, *args, **kwargs)
+
+def write(tx_function, *args, **kwargs):
+    with get_driver().session() as session:
+        return session.execute_write(tx_function, *args, **kwargs)
+
+# GRAPH_BACKEND=memory serves the social-graph reads (profile dashboard, following, followers,
+# mutuals, recommendations, popular users) from the in-process graph_engine instead of Neo4j
+GRAPH_BACKEND = os.getenv("GRAPH_BACKEND", "neo4j")
+
+def memory_graph():
+    """
+    Returns the in-memory graph engine when GRAPH_BACKEND=memory, otherwise None.
+    """
+    if GRAPH_BACKEND != "memory":
+        return None
+    # imported here so numpy is only needed by the memory backend
+    from graph_engine import get_engine
+    return get_engine()
 
 # View Profile - A user can view their own profile information
+GET_PROFILE_QUERY = """MATCH (u:User {username: $username}) 
+    RETURN """ + projection(Profile, "u") + """ AS profile"""
+
 def get_profile(tx, username):
     """
     Handles the query and runs the transaction to return a user's profile information.
     """
-    query = """MATCH (u:User {username: $username}) 
-        RETURN u"""
-    result = tx.run(query, username=username)
+    result = tx.run(GET_PROFILE_QUERY, username=username)
     record = result.single()
-    return record["u"] if record else None
+    return from_map(Profile, record["profile"]) if record else None
+
+GET_PROFILES_QUERY = """UNWIND $usernames AS username
+    MATCH (u:User {username: username})
+    RETURN """ + projection(Profile, "u") + """ AS profile"""
+
+def get_profiles(tx, usernames):
+    """
+    Returns the Profiles of every given user that exists, from one indexed lookup per username.
+    """
+    result = tx.run(GET_PROFILES_QUERY, usernames=usernames)
+    return [Profile(**record["profile"]) for record in result]
+
+GET_PROFILE_BY_EMAIL_QUERY = """MATCH (u:User {email: $email})
+    RETURN """ + projection(Profile, "u") + """ AS profile"""
+
+def get_profile_by_email(tx, email):
+    record = tx.run(GET_PROFILE_BY_EMAIL_QUERY, email=email).single()
+    return from_map(Profile, record["profile"]) if record else None
+
+# Profiles are read far more often than they change, so reads go through an LRU cache that
+# change_log keeps coherent across renames and profile updates
+profile_cache = ProfileCache(
+    fetch_many=lambda usernames: read(get_profiles, usernames),
+    fetch_by_email=lambda email: read(get_profile_by_email, email),
+)
+change_log.subscribe(profile_cache.apply)
 
 def execute_get_profile(username):
     """
-    Manages the DB session, executes the get_profile() query, and stylizes the output.
-    Call this function in other files to display a user's profile information.
+    Returns the user's Profile, or None if there is no such user.
     """
-    try:
-        driver = get_driver()
-        with driver.session() as session:
-            profile = session.execute_read(get_profile, username=username)
-            if profile:
-                print(f"\n{bold_underline('Profile Information:')}") 
-                print(f"{blue_text('Name')}: {profile['name']}")
-                print(f"{blue_text('Username')}: {profile['username']}")
-                print(f"{blue_text('Email')}: {profile['email']}")
-                if 'bio' in profile and profile['bio']:
-                    print(f"{blue_text('Bio')}: {profile['bio']}")
-                if 'location' in profile and profile['location']:
-                    print(f"{blue_text('Location')}: {profile['location']}")
-                return profile
-            else:
-                print_error(f"User with username '{username}' not found.")
-                return None
-        driver.close()
-    except exceptions.Neo4jError as e:
-        print_error(f"Neo4j Error: {e.message}")
-        return None
+    return profile_cache.get(username)
 
-# View Friends/Connections - A user can see a list of people they are following.
-def get_following(tx, username): 
+def execute_get_profiles(usernames):
     """
-    Handles the query and runs the transaction to return the nodes a user is following.
+    Returns {username: Profile} for the given users that exist, e.g. to render a list of users.
+    Cached profiles are served from memory and the rest are fetched in one query.
     """
-    query = """MATCH (p:User {username: $username})-[:FOLLOWS]->(f:User) 
-        RETURN f"""
-    nodes = tx.run(query, username=username)
-    return [node["f"] for node in nodes]
+    return profile_cache.get_many(usernames)
 
-def execute_get_following(username):
+def execute_get_profile_by_email(email):
     """
-    Manages the DB session, executes the get_following() query, and stylizes the output.
-    Call this function in other files to return a user's following.
+    Returns the Profile of the user with this email, or None.
     """
-    try:
-        driver = get_driver()
-        with driver.session() as session:
-            followed = session.execute_read(get_following, username=username)
-            print('\n\033[1m'"\033[4m" + "Your Following List:" + '\033[0m')
-            if len(followed) == 0:
-                print("You are currently not following any users.")
-            else: 
-                for user in followed:
-                    print(f"{user['name']} - {user['username']}")
-        driver.close()
-    except exceptions.Neo4jError as e:
-        print(f"Neo4j Error: {e.message}")
+    return profile_cache.get_by_email(email)
+
+# View Friends/Connections - A user can see a list of people they are following.
+FOLLOW_PAGE_SIZE = 25
+# records the driver pulls from the server per batch while a page streams in
+FETCH_SIZE = 1000
+
+GET_FOLLOWING_QUERY = """MATCH (p:User {username: $username})-[:FOLLOWS]->(f:User) 
+    WHERE f.username > $after
+    RETURN """ + projection(UserSummary, "f") + """ AS user
+    ORDER BY f.username
+    LIMIT $limit"""
+
+def get_following(tx, username, after="", limit=FOLLOW_PAGE_SIZE): 
+    """
+    Handles the query and runs the transaction to return the next page of users a user is following,
+    ordered by username and starting after the given username (keyset pagination).
+    """
+    records = tx.run(GET_FOLLOWING_QUERY, username=username, after=after, limit=limit)
+    return [UserSummary(**record["user"]) for record in records]
 
 # View Friends/Connections - A user can see a list of people who follow them.
-def get_followers(tx, username):
+GET_FOLLOWERS_QUERY = """MATCH (p:User {username: $username})<-[:FOLLOWS]-(f:User) 
+    WHERE f.username > $after
+    RETURN """ + projection(UserSummary, "f") + """ AS user
+    ORDER BY f.username
+    LIMIT $limit"""
+
+def get_followers(tx, username, after="", limit=FOLLOW_PAGE_SIZE):
     """
-    Handles the query and runs the transaction to return the nodes that follow a user.
+    Handles the query and runs the transaction to return the next page of users that follow a user,
+    ordered by username and starting after the given username (keyset pagination).
     """
-    query = """MATCH (p:User {username: $username})<-[:FOLLOWS]-(f:User) 
-        RETURN f"""
-    nodes = tx.run(query, username=username)
-    return [node["f"] for node in nodes]
+    records = tx.run(GET_FOLLOWERS_QUERY, username=username, after=after, limit=limit)
+    return [UserSummary(**record["user"]) for record in records]
 
-def execute_get_followers(username):
+def iter_user_pages(tx_function, username, page_size=FOLLOW_PAGE_SIZE, fetch_size=FETCH_SIZE):
     """
-    Manages the DB session, executes the get_followers() query, and stylizes the output.
-    Call this function in other files to return a user's followers.
+    Generator that yields pages of UserSummary from get_following/get_followers.
+    Each page is fetched in its own short read transaction only when the caller asks for it,
+    so the full list is never held in memory.
     """
-    try:
-        driver = get_driver()
-        with driver.session() as session:
-            followers = session.execute_read(get_followers, username=username)
-            print('\n\033[1m'"\033[4m" + "Your Followers:" + '\033[0m')
-            if len(followers) == 0:
-                print("You currently have no users following you.")
-            else:
-                for user in followers:
-                    print(f"{user['name']} - {user['username']}")
-        driver.close()
-    except exceptions.Neo4jError as e:
-        print(f"Neo4j Error: {e.message}")
+    driver = get_driver()
+    after = ""
+    while True:
+        with driver.session(fetch_size=fetch_size) as session:
+            page = session.execute_read(tx_function, username, after, page_size)
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        after = page[-1].username
+
+def iter_engine_pages(fetch_page, username, page_size=FOLLOW_PAGE_SIZE):
+    """
+    Same as iter_user_pages(), for pages served by the in-memory graph engine.
+    """
+    after = ""
+    while True:
+        page = fetch_page(username, after, page_size)
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        after = page[-1].username
+
+def iter_following(username, page_size=FOLLOW_PAGE_SIZE, fetch_size=FETCH_SIZE):
+    engine = memory_graph()
+    if engine is not None:
+        return iter_engine_pages(engine.following, username, page_size)
+    return iter_user_pages(get_following, username, page_size, fetch_size)
+
+def iter_followers(username, page_size=FOLLOW_PAGE_SIZE, fetch_size=FETCH_SIZE):
+    engine = memory_graph()
+    if engine is not None:
+        return iter_engine_pages(engine.followers, username, page_size)
+    return iter_user_pages(get_followers, username, page_size, fetch_size)
+
+def execute_get_following(username, after="", limit=FOLLOW_PAGE_SIZE):
+    """
+    Returns one page of the users a user is following, after the given username.
+    Use iter_following() to walk the whole list.
+    """
+    engine = memory_graph()
+    if engine is not None:
+        return engine.following(username, after, limit)
+    return read(get_following, username, after, limit)
+
+def execute_get_followers(username, after="", limit=FOLLOW_PAGE_SIZE):
+    """
+    Returns one page of the users that follow a user, after the given username.
+    Use iter_followers() to walk the whole list.
+    """
+    engine = memory_graph()
+    if engine is not None:
+        return engine.followers(username, after, limit)
+    return read(get_followers, username, after, limit)
+
+# View Profile Dashboard - A user can view their profile, follow counts and the start of both lists in one round trip.
+DASHBOARD_LIST_LIMIT = 10
+
+PROFILE_DASHBOARD_QUERY = """
+    MATCH (u:User {username: $username})
+    CALL {
+        WITH u
+        OPTIONAL MATCH (u)<-[:FOLLOWS]-(f:User)
+        WITH f
+        ORDER BY f.username
+        LIMIT $list_limit
+        RETURN collect(""" + projection(UserSummary, "f") + """) AS followers
+    }
+    CALL {
+        WITH u
+        OPTIONAL MATCH (u)-[:FOLLOWS]->(f:User)
+        WITH f
+        ORDER BY f.username
+        LIMIT $list_limit
+        RETURN collect(""" + projection(UserSummary, "f") + """) AS following
+    }
+    RETURN """ + projection(Profile, "u") + """ AS profile,
+        coalesce(u.followersCount, 0) AS followersCount,
+        coalesce(u.followingCount, 0) AS followingCount,
+        followers,
+        following
+"""
+
+def dashboard_from_record(record):
+    return ProfileDashboard(
+        profile=Profile(**record["profile"]),
+        followersCount=record["followersCount"],
+        followingCount=record["followingCount"],
+        followers=[UserSummary(**user) for user in record["followers"]],
+        following=[UserSummary(**user) for user in record["following"]],
+    )
+
+def get_profile_dashboard(tx, username, list_limit=DASHBOARD_LIST_LIMIT):
+    """
+    Handles the query and runs the transaction to return the profile, both follow counts and
+    the first list_limit followers and followed users, all from a single statement.
+    """
+    result = tx.run(PROFILE_DASHBOARD_QUERY, username=username, list_limit=list_limit)
+    record = result.single()
+    return dashboard_from_record(record) if record else None
+
+def execute_get_profile_dashboard(username, list_limit=DASHBOARD_LIST_LIMIT):
+    """
+    Returns the user's ProfileDashboard, or None if there is no such user.
+    """
+    engine = memory_graph()
+    if engine is not None:
+        return engine.dashboard(username, list_limit)
+    return read(get_profile_dashboard, username=username, list_limit=list_limit)
 
 # View Mutual Connections - A user can see mutual friends (users followed by both parties).
-def get_mutuals(tx, currentUsername, friendUsername):
+MUTUALS_PAGE_SIZE = 20
+
+# MATCH pattern and filter for each mutual-connections mode, with both users already bound as p and p2
+MUTUAL_MODES = {
+    # users both parties follow
+    "followedByBoth": ("(p)-[:FOLLOWS]->(f:User)<-[:FOLLOWS]-(p2)", ""),
+    # users who follow both parties
+    "followingBoth": ("(p)<-[:FOLLOWS]-(f:User)-[:FOLLOWS]->(p2)", ""),
+    # users who follow and are followed by both parties
+    "mutualFollow": ("(p)-[:FOLLOWS]->(f:User)<-[:FOLLOWS]-(p2)", "WHERE (f)-[:FOLLOWS]->(p) AND (f)-[:FOLLOWS]->(p2)"),
+}
+
+def mutual_pattern(mode):
+    if mode not in MUTUAL_MODES:
+        raise ValueError(f"Unknown mutuals mode '{mode}', expected one of {tuple(MUTUAL_MODES)}")
+    pattern, where = MUTUAL_MODES[mode]
+    return f"MATCH {pattern} {where}"
+
+def mutuals_query(mode):
+    match = mutual_pattern(mode)
+    return """
+        MATCH (p:User {username: $currentUsername})
+        MATCH (p2:User {username: $friendUsername})
+        CALL {
+            WITH p, p2
+            """ + match + """
+            RETURN count(f) AS total
+        }
+        CALL {
+            WITH p, p2
+            """ + match + """
+            WITH f
+            ORDER BY f.username
+            SKIP $skip
+            LIMIT $limit
+            RETURN collect(""" + projection(UserSummary, "f") + """) AS page
+        }
+        RETURN total, page
     """
-        Handles the query and runs the transaction to return the nodes that both the 
-        user and the specified friend follows.
+
+def get_mutuals(tx, currentUsername, friendUsername, mode="followedByBoth", skip=0, limit=MUTUALS_PAGE_SIZE):
     """
-    query = """
-        MATCH (p:User {username: $currentUsername})-[:FOLLOWS]->(f:User), (p2:User {username: $friendUsername})-[:FOLLOWS]->(f:User)
-        RETURN f
+        Handles the query and runs the transaction to return the total number of mutual
+        connections between the user and the specified friend, plus one page of them.
     """
-    nodes = tx.run(query, currentUsername=currentUsername, friendUsername=friendUsername)
-    return [node["f"] for node in nodes]
+    record = tx.run(mutuals_query(mode), currentUsername=currentUsername, friendUsername=friendUsername, skip=skip, limit=limit).single()
+    if record is None:
+        return 0, []
+    return record["total"], [UserSummary(**user) for user in record["page"]]
 
-def execute_get_mutuals(currentUsername, friendUsername):
+def execute_get_mutuals(currentUsername, friendUsername, mode="followedByBoth", skip=0, limit=MUTUALS_PAGE_SIZE):
     """
-    Manages the DB session, executes the get_mutuals() query, and stylizes the output.
-    Call this function in other files to return a user's mutuals friends with another user.
+    Returns (total, page) for the mutual connections of two users.
     """
-    try:
-        driver = get_driver()
-        with driver.session() as session:
-            mutuals = session.execute_read(get_mutuals, currentUsername=currentUsername, friendUsername=friendUsername)
-            print(bold_underline("\nYour Mutual Friends:"))
-
-            if len(mutuals) == 0:
-                print("\nYou have no mutual friends with this user.")
-            else:
-                for user in mutuals:
-                    print(f"{user['name']} - {user['username']}")
-        driver.close()
-    except exceptions.Neo4jError as e:
-        print(f"Neo4j Error: {e.message}")
+    engine = memory_graph()
+    if engine is not None:
+        return engine.mutuals(currentUsername, friendUsername, mode, skip, limit)
+    return read(get_mutuals, currentUsername=currentUsername, friendUsername=friendUsername, mode=mode, skip=skip, limit=limit)
+
+def mutual_counts_query(mode):
+    return """
+        UNWIND $pairs AS pair
+        MATCH (p:User {username: pair[0]})
+        MATCH (p2:User {username: pair[1]})
+        RETURN pair[0] AS currentUsername, pair[1] AS friendUsername, COUNT { """ + mutual_pattern(mode) + """ } AS mutualCount
+    """
+
+def get_mutual_counts(tx, pairs, mode="followedByBoth"):
+    """
+    Counts the mutual connections of many (username, username) pairs in one query.
+    """
+    result = tx.run(mutual_counts_query(mode), pairs=[list(pair) for pair in pairs])
+    return {(record["currentUsername"], record["friendUsername"]): record["mutualCount"] for record in result}
+
+def execute_get_mutual_counts(pairs, mode="followedByBoth"):
+    """
+    Returns a dict mapping every (username, username) pair to its number of mutual connections,
+    e.g. to score a list of candidate friends. Pairs with an unknown user count as 0.
+    """
+    counts = read(get_mutual_counts, pairs=pairs, mode=mode)
+    return {tuple(pair): counts.get(tuple(pair), 0) for pair in pairs}
 
 # Follow Another User - A user can follow another user, creating a "FOLLOWS" relationship in Neo4j.
-def follow(tx, currentUsername, targetUsername):
-    check_query = """ 
-    MATCH (u:User {username: $currentUsername})
-    OPTIONAL MATCH (u2:User {username: $targetUsername})
-    OPTIONAL MATCH (u)-[r:FOLLOWS]->(u2)
-    WITH u, u2, r WHERE u.username <> u2.username
-    RETURN u2, r IS NOT NULL as alreadyFollowed
+FOLLOW_MANY_QUERY = """
+    OPTIONAL MATCH (u:User {username: $currentUsername})
+    UNWIND $targetUsernames AS targetUsername
+    OPTIONAL MATCH (u2:User {username: targetUsername})
+    OPTIONAL MATCH (u)-[existing:FOLLOWS]->(u2)
+    WITH u, u2, targetUsername,
+        CASE
+            WHEN u IS NULL OR u2 IS NULL THEN 'notFound'
+            WHEN u = u2 THEN 'selfFollow'
+            WHEN existing IS NOT NULL THEN 'alreadyFollowed'
+            ELSE 'created'
+        END AS status
+    FOREACH (_ IN CASE WHEN status = 'created' THEN [1] ELSE [] END |
+        MERGE (u)-[r:FOLLOWS]->(u2)
+        // counters move only when MERGE really creates the relationship, so two concurrent
+        // follows of the same pair that both classified it as created count it once
+        // a counter that was never backfilled is counted from the relationships instead
+        ON CREATE SET r.since = datetime(),
+            u.followingCount = CASE WHEN u.followingCount IS NULL THEN COUNT { (u)-[:FOLLOWS]->(:User) } ELSE u.followingCount + 1 END,
+            u2.followersCount = CASE WHEN u2.followersCount IS NULL THEN COUNT { (u2)<-[:FOLLOWS]-(:User) } ELSE u2.followersCount + 1 END,
+            u.graphChangedAt = datetime(),
+            u2.graphChangedAt = datetime()
+    )
+    RETURN targetUsername, status
+"""
+
+def follow_many(tx, currentUsername, targetUsernames):
     """
-    result = tx.run(check_query, currentUsername=currentUsername, targetUsername=targetUsername)
-    record = result.single()
-    if not record or not record["u2"]:
-        return None
-    elif record["alreadyFollowed"]:
-        return "alreadyFollowed"
-    else:
-        follow_query = """
-        MATCH (u:User {username: $currentUsername})
-        OPTIONAL MATCH (u2:User {username: $targetUsername})
-        WITH u, u2 WHERE u.username <> u2.username
-        MERGE (u)-[:FOLLOWS]->(u2)
-        RETURN u, u2
-        """
-        result = tx.run(follow_query, currentUsername=currentUsername, targetUsername=targetUsername)
-        record = result.single()
-        return record["u2"]["username"]
+    Follows every target in a single statement and classifies each one as
+    notFound, selfFollow, alreadyFollowed or created.
+    """
+    # duplicate targets would otherwise both be reported as created
+    targets = list(dict.fromkeys(targetUsernames))
+    result = tx.run(FOLLOW_MANY_QUERY, currentUsername=currentUsername, targetUsernames=targets)
+    return {record["targetUsername"]: record["status"] for record in result}
+
+def follow(tx, currentUsername, targetUsername):
+    return follow_many(tx, currentUsername, [targetUsername])[targetUsername]
 
 def execute_follow(currentUsername, targetUsername):
-    try:
-        driver = get_driver()
-        with driver.session() as session:
-            follow_result = session.execute_write(follow, currentUsername=currentUsername, targetUsername=targetUsername)
-            if follow_result is None or len(follow_result) == 0:
-                print_error("The user doesn't exist in the system. Please try again.")
-            elif follow_result == "alreadyFollowed":
-                print_error("You are already following this user.")
-            else:
-                print_success(f"You are now following {targetUsername}!")
-        driver.close()
-    except exceptions.Neo4jError as e:
-        print(f"Neo4j Error: {e.message}")
+    """
+    Returns the follow status: notFound, selfFollow, alreadyFollowed or created.
+    """
+    follow_result = write(follow, currentUsername=currentUsername, targetUsername=targetUsername)
+    if follow_result == "created":
+        change_log.record("follow", currentUsername, targetUsername)
+    return follow_result
+
+def execute_follow_many(currentUsername, targetUsernames):
+    """
+    Follows a whole list of users in one transaction, e.g. during onboarding.
+    Returns a dict mapping each target username to its follow status.
+    """
+    if len(targetUsernames) == 0:
+        return {}
+
+    results = write(follow_many, currentUsername=currentUsername, targetUsernames=targetUsernames)
+    for targetUsername, status in results.items():
+        if status == "created":
+            change_log.record("follow", currentUsername, targetUsername)
+    return results
 
 # Unfollow a User - A user can unfollow another user, removing the "FOLLOWS" relationship.
-def unfollow(tx, currentUsername, targetUsername):
-    query = """ 
+UNFOLLOW_QUERY = """ 
     MATCH (u:User {username: $currentUsername})
     MATCH (u2:User {username: $targetUsername})
     MATCH (u)-[f:FOLLOWS]->(u2)
     DELETE f
+    SET u.followingCount = CASE WHEN u.followingCount IS NULL THEN COUNT { (u)-[:FOLLOWS]->(:User) } ELSE u.followingCount - 1 END,
+        u2.followersCount = CASE WHEN u2.followersCount IS NULL THEN COUNT { (u2)<-[:FOLLOWS]-(:User) } ELSE u2.followersCount - 1 END,
+        u.graphChangedAt = datetime(),
+        u2.graphChangedAt = datetime()
     RETURN COUNT(f) AS deleted
-    """
-    result = tx.run(query, currentUsername=currentUsername, targetUsername=targetUsername)
+"""
+
+def unfollow(tx, currentUsername, targetUsername):
+    result = tx.run(UNFOLLOW_QUERY, currentUsername=currentUsername, targetUsername=targetUsername)
     record = result.single()
     if record:
         return record["deleted"] > 0
@@ -190,364 +412,526 @@ def unfollow(tx, currentUsername, targetUsername):
         return False
 
 def execute_unfollow(currentUsername, targetUsername):
-    try:
-        driver = get_driver()
-        with driver.session() as session:
-            unfollow_result = session.execute_write(unfollow, currentUsername=currentUsername, targetUsername=targetUsername)
-            if unfollow_result:
-                print_success(f"You unfollowed {targetUsername}!")
-            else:
-                print_error(f"Error: You don't follow {targetUsername}")
-        driver.close()
-    except exceptions.Neo4jError as e:
-        print(f"Neo4j Error: {e.message}")
-
-# Search Users - A user can search for other users by name or username. The system returns a list of matching users.
-def search_users(tx, target):
-    query = """
-    MATCH (u:User) WHERE u.name = $target OR u.username = $target
-    RETURN u
     """
-    result = tx.run(query, target=target)
-    return [node["u"] for node in result]
+    Returns True if the FOLLOWS relationship existed and was removed.
+    """
+    unfollow_result = write(unfollow, currentUsername=currentUsername, targetUsername=targetUsername)
+    if unfollow_result:
+        change_log.record("unfollow", currentUsername, targetUsername)
+    return unfollow_result
+
+# Search Users - A user can search for other users by name, username, bio or location. The system returns a page of matching users ranked by relevance.
+SEARCH_USERS_QUERY = """
+    CALL db.index.fulltext.queryNodes($index, $search_query, {skip: $skip, limit: $limit})
+    YIELD node, score
+    RETURN """ + projection(SearchResult, "node", score="score") + """ AS user
+"""
+
+def search_users(tx, target, skip=0, limit=SEARCH_PAGE_SIZE):
+    """
+    Runs a prefix/fuzzy full-text search and returns up to limit projected users, best match first.
+    """
+    search_query = build_fulltext_query(target)
+    if search_query is None:
+        return []
 
-def execute_search_users(target):
-    try:
-        driver = get_driver()
-        with driver.session() as session:
-            users = session.execute_read(search_users, target=target)
-            print(f"\n{bold_underline(f'Results for {target}: ')}")
-
-            if len(users) == 0:
-                print("No users matched your search")
-            else:
-                for user in users:
-                    output = f"{blue_text('Name')}: {user['name']} - {blue_text('Username')}: {user['username']}"
-                    if len(user["bio"]) > 0:
-                        output += f" - {blue_text('Bio')}: {user['bio']}"
-                    print(output)
-        driver.close()
-    except exceptions.Neo4jError as e:
-        print(f"Neo4j Error: {e.message}")
+    result = tx.run(SEARCH_USERS_QUERY, index=SEARCH_INDEX, search_query=search_query, skip=skip, limit=limit)
+    return [SearchResult(**record["user"]) for record in result]
+
+def execute_search_users(target, skip=0, limit=SEARCH_PAGE_SIZE):
+    """
+    Returns up to limit SearchResults starting at skip, best match first.
+    """
+    return read(search_users, target=target, skip=skip, limit=limit)
 
 # create user on sign up
-def create_user(tx, new_user):
-    query = """
-     MATCH (u:User)
-    WHERE u.email = $email OR u.username = $username
-    WITH count(u) AS existingCount
-    CALL apoc.do.when(
-        existingCount = 0,
-        'CREATE (newUser:User {
-            name: $name, 
-            email: $email, 
-            username: $username, 
-            password: $password,
-            bio: $bio,
-            location: $location,
-            createdAt: datetime()
-        })
-        RETURN {message: "User created successfully", user: newUser, success: true} AS result',
-        'RETURN {message: "Email or username already exists", user: null, success: false} AS result',
-        {name: $name, email: $email, username: $username, password: $password, bio: $bio, location: $location}
-    ) YIELD value
-    RETURN value.result AS result
+CREATE_USER_QUERY = """
+    CREATE (newUser:User {
+        name: $name,
+        email: $email,
+        username: $username,
+        passwordHash: $passwordHash,
+        bio: $bio,
+        location: $location,
+        followersCount: 0,
+        followingCount: 0,
+        createdAt: datetime()
+    })
+    RETURN {message: "User created successfully", user: """ + projection(Profile, "newUser") + """, success: true} AS result
+"""
+
+def new_user_row(new_user, password_hash):
     """
-    
-    result = tx.run(query, name=new_user["name"], username=new_user["username"], email=new_user["email"], password=new_user["password"], bio=new_user["bio"], location=new_user["location"])
+    The properties written for a signup. Only the hash of the password is stored.
+    """
+    return {
+        "name": new_user["name"],
+        "username": new_user["username"],
+        "email": new_user["email"],
+        "passwordHash": password_hash,
+        "bio": new_user.get("bio") or "",
+        "location": new_user.get("location") or "",
+    }
+
+def create_user(tx, new_user, password_hash):
+    """
+    Creates the user in one statement. The unique constraints on username and email
+    reject duplicates, which execute_create_user() reports as "already exists".
+    """
+    result = tx.run(CREATE_USER_QUERY, **new_user_row(new_user, password_hash))
     record = result.single()
-    return record["result"]
+    return {**record["result"], "user": from_map(Profile, record["result"]["user"])}
 
-def execute_create_user(new_user):
+def validate_new_user(new_user):
+    """
+    Returns an error message if a required signup field is missing, otherwise None.
+    """
     required_fields = ["name", "username", "email", "password"]
 
     for field in required_fields:
-        if len(new_user[field]) == 0:
-            return f"Error: {field} cannot be empty", None
+        if len(new_user.get(field) or "") == 0:
+            return f"Error: {field} cannot be empty"
+    return None
+
+def execute_create_user(new_user):
+    error = validate_new_user(new_user)
+    if error:
+        return error, None
     
     try:
-        driver = get_driver()
-
-        with driver.session() as session:
-            result = session.execute_write(create_user, new_user)
-            driver.close()
-            return result["message"], result["user"]
+        # hashed once up front, not inside the transaction function that the driver may retry
+        result = write(create_user, new_user, hash_password(new_user["password"]))
+        change_log.record("create", result["user"].username, fields=result["user"]._asdict())
+        return result["message"], result["user"]
+    except exceptions.ConstraintError:
+        return "Email or username already exists", None
     except exceptions.Neo4jError as e:
         return f"Neo4j Error: {e.message}", None
+
+# Bulk signup - provisions many accounts per transaction with a per-row outcome.
+CREATE_USERS_QUERY = """
+    UNWIND $users AS row
+    OPTIONAL MATCH (byUsername:User {username: row.username})
+    OPTIONAL MATCH (byEmail:User {email: row.email})
+    WITH row, byUsername IS NULL AND byEmail IS NULL AS available
+    FOREACH (_ IN CASE WHEN available THEN [1] ELSE [] END |
+        CREATE (:User {
+            name: row.name,
+            email: row.email,
+            username: row.username,
+            passwordHash: row.passwordHash,
+            bio: row.bio,
+            location: row.location,
+            followersCount: 0,
+            followingCount: 0,
+            createdAt: datetime()
+        })
+    )
+    RETURN row.username AS username, available AS success
+"""
+
+def create_users(tx, new_users, password_hashes):
+    """
+    Creates every user whose username and email are both free. Rows are expected to be
+    unique within the batch; both lookups are backed by the unique constraints.
+    password_hashes holds the hash of each user's password, in the same order.
+    """
+    rows = [new_user_row(user, password_hash) for user, password_hash in zip(new_users, password_hashes)]
+    result = tx.run(CREATE_USERS_QUERY, users=rows)
+    return {record["username"]: record["success"] for record in result}
+
+def prepare_new_users(new_users):
+    """
+    Validates a signup batch before anything is written. Returns (outcomes, pending): outcomes
+    holds the result of each rejected row at its input position, pending the positions to create.
+    """
+    outcomes = [None] * len(new_users)
+    pending = []
+    seen_usernames = set()
+    seen_emails = set()
+
+    for i, new_user in enumerate(new_users):
+        error = validate_new_user(new_user)
+        if error is None and (new_user["username"] in seen_usernames or new_user["email"] in seen_emails):
+            error = "Email or username already exists"
+        if error:
+            outcomes[i] = {"username": new_user.get("username"), "message": error, "success": False}
+        else:
+            seen_usernames.add(new_user["username"])
+            seen_emails.add(new_user["email"])
+            pending.append(i)
+    return outcomes, pending
+
+def record_created_users(new_users, chunk, created, error, outcomes):
+    """
+    Fills in the outcomes of one written batch and records each new user in change_log.
+    created is the result of create_users(), or None when the batch failed with error.
+    """
+    for i in chunk:
+        username = new_users[i]["username"]
+        if created is None:
+            outcomes[i] = {"username": username, "message": error, "success": False}
+        elif created[username]:
+            outcomes[i] = {"username": username, "message": "User created successfully", "success": True}
+            change_log.record("create", username, fields={field: new_users[i].get(field) for field in Profile._fields})
+        else:
+            outcomes[i] = {"username": username, "message": "Email or username already exists", "success": False}
+
+def execute_create_users(new_users, batch_size=1000):
+    """
+    Creates accounts in batches of batch_size users per transaction.
+    Returns one {"username", "message", "success"} dict per input row, in input order.
+    """
+    outcomes, pending = prepare_new_users(new_users)
+
+    driver = get_driver()
+    with driver.session() as session:
+        for start in range(0, len(pending), batch_size):
+            chunk = pending[start:start + batch_size]
+            batch = [new_users[i] for i in chunk]
+            password_hashes = hash_passwords([new_user["password"] for new_user in batch])
+            created, error = None, None
+            try:
+                try:
+                    created = session.execute_write(create_users, batch, password_hashes)
+                except exceptions.ConstraintError:
+                    # a concurrent signup took a name between the check and the create; re-classify
+                    created = session.execute_write(create_users, batch, password_hashes)
+            except exceptions.Neo4jError as e:
+                error = f"Neo4j Error: {e.message}"
+            record_created_users(new_users, chunk, created, error, outcomes)
+
+    return outcomes
     
-def login(tx, username, password):
-    query = """
+# Login - the account is fetched by its indexed username and the password verified in Python;
+# the query never compares passwords.
+LOGIN_QUERY = """
     MATCH (u:User {username: $username})
-    WHERE u.password = $password
-    RETURN 
-        CASE 
-            WHEN u IS NOT NULL THEN 
-                {message: "Login successful", user: u, success: true}
-            ELSE 
-                {message: "Invalid username or password", user: null, success: false}
-        END AS result
+    RETURN """ + projection(Profile, "u") + """ AS user, u.passwordHash AS passwordHash, u.password AS legacyPassword
+"""
+
+SET_PASSWORD_HASH_QUERY = """
+    MATCH (u:User {username: $username})
+    SET u.passwordHash = $passwordHash
+    REMOVE u.password
+"""
+
+def login(tx, username):
     """
+    Returns (Profile, passwordHash, legacyPassword) for the username, or (None, None, None).
+    Accounts created before password hashing have only the plaintext legacyPassword.
+    """
+    record = tx.run(LOGIN_QUERY, username=username).single()
+    if record is None:
+        return None, None, None
+    return from_map(Profile, record["user"]), record["passwordHash"], record["legacyPassword"]
 
-    result = tx.run(query, username=username, password=password)
-    record = result.single()
-    if record and record['result']:
-        return record['result']
-    else:
-        return { "message": "Invalid username or password", "user": None }
+def set_password_hash(tx, username, password_hash):
+    """
+    Stores a new password hash and drops any plaintext password left on the account.
+    """
+    tx.run(SET_PASSWORD_HASH_QUERY, username=username, passwordHash=password_hash).consume()
 
 def execute_login(username, password):
     if len(username) == 0 or len(password) == 0:
         return f"Error: username or password cannot be empty", None
     
     try:
-        driver = get_driver()
-
-        with driver.session() as session:
-            result = session.execute_read(login, username, password)
-            driver.close()
-            return result["message"], result["user"]
+        user, password_hash, legacy_password = read(login, username)
+        valid, upgrade = check_password(password, password_hash, legacy_password)
+        if not valid:
+            return "Invalid username or password", None
+        if upgrade:
+            # a plaintext or outdated-cost account gets a current hash now that the password is known
+            write(set_password_hash, user.username, hash_password(password))
+        profile_cache.put(user)
+        return "Login successful", user
     except exceptions.Neo4jError as e:
         return f"Neo4j Error: {e.message}", None
-    
 
-def update_username(tx, current_email, new_username):
-    query = """
-    OPTIONAL MATCH (existing:User {username: $new_username})
-    WITH existing
-    WHERE existing IS NULL
-    MATCH (u:User {email: $current_email})
-    SET u.username = $new_username
-    RETURN u
+# Sessions - a verified login issues a short-lived token, so later authenticated calls skip the password hash
+def execute_start_session(username, password):
     """
+    execute_login() that also issues a session token. Returns (message, user, token);
+    user and token are None when the login failed.
+    """
+    message, user = execute_login(username, password)
+    if user is None:
+        return message, None, None
+    return message, user, sessions.issue(user.username)
 
-    result = tx.run(query, current_email=current_email, new_username=new_username)
-    record = result.single()
+def execute_get_session(token):
+    """
+    Returns the Profile of the token's user, or None if the session is unknown or expired.
+    """
+    username = sessions.get(token)
+    return execute_get_profile(username) if username is not None else None
 
-    if record and record["u"]:
-        print_success("\nUsername updated successfully!")
-        return True
-    else:
-        print_error("\nError: Username already taken!")
-        return False
+def execute_end_session(token):
+    sessions.revoke(token)
 
-def execute_update_username(current_email, new_username):
-    if len(new_username) == 0:
-        print_error("Error: Username cannot be empty!")
-        return False
-    
-    try:
-        driver = get_driver()
-        with driver.session() as session:
-            success = session.execute_write(update_username, current_email, new_username)
-            driver.close()
-            return success
-    except exceptions.Neo4jError as e:
-        print_error(f"Neo4j Error: {e.message}")
-        return False
-    
+change_log.subscribe(sessions.apply)
+
+# Edit Profile - any subset of the editable fields is saved in one transaction
+PROFILE_UPDATE_FIELDS = ("name", "username", "password", "bio", "location")
+REQUIRED_PROFILE_FIELDS = ("name", "username", "password")
 
-def update_name(tx, current_email, new_name):
-    query = """
-    MATCH (u:User {email: $current_email})
-    SET u.name = $new_name
-    RETURN u
+def validate_profile_changes(changes):
     """
+    Returns an error message for an unknown field or an empty required field, otherwise None.
+    """
+    for field, value in changes.items():
+        if field not in PROFILE_UPDATE_FIELDS:
+            return f"{field} cannot be edited"
+        if field in REQUIRED_PROFILE_FIELDS and len(value or "") == 0:
+            return f"{field.capitalize()} cannot be empty"
+    return None
+
+UPDATE_PROFILES_QUERY = """
+    UNWIND $rows AS row
+    MATCH (u:User {email: row.email})
+    // only a username change can collide; a null username matches nothing
+    OPTIONAL MATCH (existing:User {username: row.changes.username})
+    WITH row, u, u.username AS previous, existing IS NOT NULL AND existing <> u AS taken
+    FOREACH (_ IN CASE WHEN taken THEN [] ELSE [1] END |
+        SET u += row.changes
+    )
+    RETURN row.email AS email, previous, taken
+"""
+
+def update_profiles(tx, rows):
+    """
+    Applies each row's changes map to the user with that email, unless the row renames the user
+    to a username that is already taken. Returns {email: (status, previous_username)}.
+    """
+    result = tx.run(UPDATE_PROFILES_QUERY, rows=rows)
+    outcomes = {row["email"]: ("notFound", None) for row in rows}
+    for record in result:
+        outcomes[record["email"]] = ("usernameTaken" if record["taken"] else "updated", record["previous"])
+    return outcomes
 
-    result = tx.run(query, current_email=current_email, new_name=new_name)
-    record = result.single()
+def stored_changes(changes, password_hash=None):
+    """
+    Returns the changes map as written to the node: a new password is stored only as its
+    passwordHash, and password is set to null so SET u += removes any legacy plaintext.
+    """
+    if "password" not in changes:
+        return dict(changes)
+    stored = {field: value for field, value in changes.items() if field != "password"}
+    stored["passwordHash"] = password_hash or hash_password(changes["password"])
+    stored["password"] = None
+    return stored
+
+def record_profile_change(previous, changes):
+    """
+    Tells the in-process caches about a committed profile update. A password change
+    ends the user's sessions.
+    """
+    username = changes.get("username", previous)
+    if username != previous:
+        change_log.record("rename", previous, username)
+    if "passwordHash" in changes:
+        sessions.revoke_user(username)
+    fields = {field: value for field, value in changes.items() if field not in ("username", "password", "passwordHash")}
+    if fields:
+        change_log.record("update", username, fields=fields)
+
+def prepare_profile_updates(updates):
+    """
+    Validates (email, changes) pairs before anything is written. Returns (outcomes, pending):
+    outcomes maps each rejected email to invalid or usernameTaken, pending holds the rows to write.
+    """
+    outcomes = {}
+    pending = []
+    new_usernames = set()
+    for email, changes in updates:
+        if validate_profile_changes(changes) is not None:
+            outcomes[email] = "invalid"
+        elif changes.get("username") in new_usernames:
+            # two rows in the same run cannot take the same username
+            outcomes[email] = "usernameTaken"
+        else:
+            if "username" in changes:
+                new_usernames.add(changes["username"])
+            pending.append({"email": email, "changes": changes})
+    return outcomes, pending
+
+def new_passwords(rows):
+    return [row["changes"]["password"] for row in rows if "password" in row["changes"]]
+
+def record_profile_updates(rows, results, outcomes):
+    """
+    Fills in the outcomes of one written batch of update_profiles() rows and tells the caches.
+    """
+    for row in rows:
+        status, previous = results[row["email"]]
+        outcomes[row["email"]] = status
+        if status == "updated":
+            record_profile_change(previous, row["changes"])
 
-    if record and record["u"]:
-        print_success("\nName updated successfully!")
-        return True
-    else:
-        print_error("\nAn error occurred")
-        return False
+def execute_update_profiles(updates, batch_size=1000):
+    """
+    Bulk form of execute_update_profile() for back-fills: updates is a list of (email, changes)
+    pairs, applied batch_size rows per transaction. Returns {email: status} with one of
+    updated, usernameTaken, notFound or invalid.
+    """
+    outcomes, pending = prepare_profile_updates(updates)
+
+    # new passwords are hashed together on the shared pool rather than one by one
+    password_hashes = iter(hash_passwords(new_passwords(pending)))
+    for row in pending:
+        row["changes"] = stored_changes(row["changes"], next(password_hashes) if "password" in row["changes"] else None)
+
+    driver = get_driver()
+    with driver.session() as session:
+        for start in range(0, len(pending), batch_size):
+            rows = pending[start:start + batch_size]
+            try:
+                results = session.execute_write(update_profiles, rows)
+            except exceptions.ConstraintError:
+                # a concurrent rename took a username between the check and the write; retry to re-classify
+                results = session.execute_write(update_profiles, rows)
+
+            record_profile_updates(rows, results, outcomes)
+    return outcomes
+
+def execute_update_profile(current_email, changes):
+    """
+    Saves any subset of name, username, password, bio and location with a single SET u += $changes.
+    Returns updated, usernameTaken or notFound. Raises ValueError for unknown or empty required fields.
+    """
+    error = validate_profile_changes(changes)
+    if error:
+        raise ValueError(error)
+    if len(changes) == 0:
+        return "updated"
 
-def execute_update_name(current_email, new_name):
-    if len(new_name) == 0:
-        print_error("Error: Name cannot be empty!")
-        return False
-    
+    rows = [{"email": current_email, "changes": stored_changes(changes)}]
     try:
-        driver = get_driver()
-        with driver.session() as session:
-            success = session.execute_write(update_name, current_email, new_name)
-            driver.close()
-            return success
-    except exceptions.Neo4jError as e:
-        print_error(f"Neo4j Error: {e.message}")
+        status, previous = write(update_profiles, rows)[current_email]
+    except exceptions.ConstraintError:
+        return "usernameTaken"
+    if status == "updated":
+        record_profile_change(previous, rows[0]["changes"])
+    return status
+
+def update_field(current_email, field, value):
+    """
+    Saves a single field. Returns False instead of raising when the value is empty or invalid.
+    """
+    try:
+        return execute_update_profile(current_email, {field: value}) == "updated"
+    except ValueError:
         return False
-    
 
-def update_password(tx, current_email, new_password):
-    query = """
-    MATCH (u:User {email: $current_email})
-    SET u.password = $new_password
-    RETURN u
+def execute_update_username(current_email, new_username):
     """
+    Returns False if the username is empty or already taken.
+    """
+    return update_field(current_email, "username", new_username)
 
-    result = tx.run(query, current_email=current_email, new_password=new_password)
-    record = result.single()
-
-    if record and record["u"]:
-        print_success("\nPassword updated successfully!")
-        return True
-    else:
-        print_error("\nAn error occurred")
-        return False
+def execute_update_name(current_email, new_name):
+    """
+    Returns True if the user was updated.
+    """
+    return update_field(current_email, "name", new_name)
 
 def execute_update_password(current_email, new_password):
-    if len(new_password) == 0:
-        print_error("Error: Password cannot be empty!")
-        return False
-    
-    try:
-        driver = get_driver()
-        with driver.session() as session:
-            success = session.execute_write(update_password, current_email, new_password)
-            driver.close()
-            return success
-    except exceptions.Neo4jError as e:
-        print_error(f"Neo4j Error: {e.message}")
-        return False
-    
-def update_bio(tx, current_email, new_bio):
-    query = """
-    MATCH (u:User {email: $current_email})
-    SET u.bio = $new_bio
-    RETURN u
     """
+    Returns True if the user was updated.
+    """
+    return update_field(current_email, "password", new_password)
 
-    result = tx.run(query, current_email=current_email, new_bio=new_bio)
-    record = result.single()
-
-    if record and record["u"]:
-        print_success("\nBio updated successfully!")
-        return True
-    else:
-        print_error("\nAn error occurred")
-        return False
 def execute_update_bio(current_email, new_bio):
-    try:
-        driver = get_driver()
-        with driver.session() as session:
-            success = session.execute_write(update_bio, current_email, new_bio)
-            driver.close()
-            return success
-    except exceptions.Neo4jError as e:
-        print_error(f"Neo4j Error: {e.message}")
-        return False
-    
-def update_location(tx, current_email, new_location):
-    query = """
-    MATCH (u:User {email: $current_email})
-    SET u.location = $new_location
-    RETURN u
     """
+    Returns True if the user was updated.
+    """
+    return update_field(current_email, "bio", new_bio)
 
-    result = tx.run(query, current_email=current_email, new_location=new_location)
-    record = result.single()
-
-    if record and record["u"]:
-        print_success("\nLocation updated successfully!")
-        return True
-    else:
-        print_error("\nAn error occurred")
-        return False
 def execute_update_location(current_email, new_location):
-    try:
-        driver = get_driver()
-        with driver.session() as session:
-            success = session.execute_write(update_location, current_email, new_location)
-            driver.close()
-            return success
-    except exceptions.Neo4jError as e:
-        print_error(f"Neo4j Error: {e.message}")
-        return False
-    
-def get_recommendations(tx, current_username):
-    query = """
-    MATCH (me:User {username: $current_username})-[:FOLLOWS]-(friend)-[:FOLLOWS]-(suggestion:User)
-    WHERE NOT (me)-[:FOLLOWS]-(suggestion)
-    AND me <> suggestion
-    RETURN DISTINCT suggestion, count(friend) AS mutualConnections
-    ORDER BY mutualConnections DESC
-    LIMIT 10
     """
+    Returns True if the user was updated.
+    """
+    return update_field(current_email, "location", new_location)
+
+STORED_RECOMMENDATIONS_QUERY = """
+    MATCH (me:User {username: $current_username})
+    CALL {
+        WITH me
+        OPTIONAL MATCH (me)-[r:RECOMMENDED]->(suggestion:User)
+        // users connected since the last batch run are no longer suggestions, as in the live query
+        WHERE NOT (me)-[:FOLLOWS]-(suggestion)
+        WITH suggestion, r
+        ORDER BY r.score DESC, suggestion.username
+        SKIP $skip
+        LIMIT $limit
+        RETURN collect(""" + projection(Recommendation, "suggestion", mutualConnections="r.mutualConnections", score="r.score") + """) AS page
+    }
+    RETURN me.recommendationsComputedAt IS NOT NULL AS precomputed, page
+"""
+
+LIVE_RECOMMENDATIONS_QUERY = """
+    MATCH (me:User {username: $current_username})
+    """ + SCORED_SUGGESTIONS + """
+    RETURN """ + projection(Recommendation, "suggestion", mutualConnections="mutualConnections", score="score") + """ AS user
+    // the subquery's ORDER BY only picks the page; rows leave CALL in no guaranteed order
+    ORDER BY score DESC, suggestion.username
+"""
+
+def get_recommendations(tx, current_username, skip=0, limit=RECOMMENDATION_PAGE_SIZE, scoring=DEFAULT_SCORING):
+    """
+    Returns a page of friend-of-friend suggestions with their score and mutual connection count.
+    Reads the suggestions stored by the batch job when they exist, otherwise scores them live.
+    """
+    if scoring == DEFAULT_SCORING:
+        record = tx.run(STORED_RECOMMENDATIONS_QUERY, current_username=current_username, skip=skip, limit=limit).single()
+        if record is None:
+            return []
+        if record["precomputed"]:
+            return [Recommendation(**user) for user in record["page"]]
 
-    result = tx.run(query, current_username=current_username)
-    return [node["suggestion"] for node in result]
+    result = tx.run(LIVE_RECOMMENDATIONS_QUERY, current_username=current_username, **scoring_params(scoring, skip, limit))
+    return [Recommendation(**record["user"]) for record in result]
 
-def execute_get_recommendations(current_username):
-    if len(current_username) == 0:
-        print_error("Username cannot be empty!")
-        return
-    
-    try:
-        driver = get_driver()
-        with driver.session() as session:
-            recommendations = session.execute_read(get_recommendations, current_username)
-
-            print(f"\n{bold_underline(f'Recommendations: ')}")
-
-            if len(recommendations) == 0:
-                print("No recommendations found.")
-            else:
-                for user in recommendations:
-                    output = f"{blue_text('Name')}: {user['name']} - {blue_text('Username')}: {user['username']}"
-                    if len(user["bio"]) > 0:
-                        output += f" - {blue_text('Bio')}: {user['bio']}"
-                    print(output)
-        driver.close()
-    except exceptions.Neo4jError as e:
-        print_error(f"Neo4j Error: {e.message}")
-        return
-    
-def get_most_followed(tx):
-    query = """
+def execute_get_recommendations(current_username, skip=0, limit=RECOMMENDATION_PAGE_SIZE, scoring=DEFAULT_SCORING):
+    """
+    Returns up to limit Recommendations starting at skip, best score first.
+    """
+    engine = memory_graph()
+    if engine is not None:
+        return engine.recommendations(current_username, skip, limit, scoring)
+    return read(get_recommendations, current_username, skip, limit, scoring)
+
+GET_MOST_FOLLOWED_QUERY = """
     MATCH (u:User)
-    OPTIONAL MATCH (follower:User)-[:FOLLOWS]->(u)
-    RETURN u {.*, password: null, id: null} AS user, count(follower) AS followersCount
-    ORDER BY followersCount DESC
+    WHERE u.followersCount IS NOT NULL
+    RETURN """ + projection(PopularUser, "u") + """ AS user
+    ORDER BY u.followersCount DESC
     LIMIT 10
-    """
+"""
 
-    result = tx.run(query)
-    return [{ "user": node["user"], "num_followers": node["followersCount"] } for node in result]
+def get_most_followed(tx):
+    result = tx.run(GET_MOST_FOLLOWED_QUERY)
+    return [PopularUser(**record["user"]) for record in result]
 
-def execute_get_most_followed():
-    try:
-        driver = get_driver()
-        with driver.session() as session:
-            most_followed = session.execute_read(get_most_followed)
-            
-            print(f"\n{bold_underline(f'Top 10 most followed users: ')}")
-
-            if len(most_followed) == 0:
-                 print("No users found.")
-            else:
-                count = 1
-                for item in most_followed:
-                    user = item['user']
-                    num_followers = item['num_followers']
-                    output = ''
-                    i = 0
-                   
-                    print(orange_text(f"{count}. {num_followers} followers"))
-
-                    for key in user:
-                        if user[key] is not None:
-                            if i > 0:
-                                output += " - "
-                            output += f"{blue_text(key)}: {user[key]}"
-                            i += 1
-
-                    print(output)
-                    print()
-                    count += 1
-
-            driver.close()
+def fetch_most_followed():
+    engine = memory_graph()
+    if engine is not None:
+        return engine.most_followed()
+    return read(get_most_followed)
 
-    except exceptions.Neo4jError as e:
-        print_error(f"Neo4j Error: {e.message}")
-        return
\ No newline at end of file
+# Every user sees the same top 10, so it is served from memory and refreshed in the background
+most_followed_cache = LeaderboardCache(fetch_most_followed)
+
+def invalidate_most_followed(event):
+    # follower counts, names and usernames shown in the top 10 can all change; new users have no followers yet
+    if event.kind != "create":
+        most_followed_cache.invalidate()
+
+change_log.subscribe(invalidate_most_followed)
+
+def execute_get_most_followed():
+    """
+    Returns the 10 most followed users as PopularUsers, served from the leaderboard cache.
+    """
+    return most_followed_cache.get()
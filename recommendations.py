@@ -0,0 +1,59 @@
+# Friend-of-friend recommendation scoring shared by the online query and batch jobs
+RECOMMENDATION_PAGE_SIZE = 10
+
+# Per-hop fan-out caps: at most MAX_FRIENDS neighbours of the user are expanded, and at most
+# MAX_FANOUT neighbours of each of those, so following a celebrity cannot blow up the query.
+RECOMMENDATION_MAX_FRIENDS = 500
+RECOMMENDATION_MAX_FANOUT = 200
+
+# "adamicAdar" weights each mutual connection by 1/log(degree), so mutuals through
+# supernodes count less; "mutual" ranks by the plain number of mutual connections.
+SCORING_METHODS = ("adamicAdar", "mutual")
+DEFAULT_SCORING = "adamicAdar"
+
+# Expects `me` to be bound and yields one row per suggestion: suggestion, mutualConnections, score.
+# Parameters: $max_friends, $max_fanout, $scoring, $skip, $limit.
+SCORED_SUGGESTIONS = """
+    CALL {
+        WITH me
+        OPTIONAL MATCH (me)-[:FOLLOWS]-(n:User)
+        RETURN collect(DISTINCT n) AS neighbours
+    }
+    CALL {
+        WITH me, neighbours
+        UNWIND neighbours[..$max_friends] AS friend
+        CALL {
+            WITH friend
+            MATCH (friend)-[:FOLLOWS]-(candidate:User)
+            RETURN DISTINCT candidate
+            LIMIT $max_fanout
+        }
+        WITH me, neighbours, friend, candidate
+        WHERE candidate <> me AND NOT candidate IN neighbours
+        WITH candidate, friend, COUNT { (friend)-[:FOLLOWS]-() } AS degree
+        WITH candidate,
+            count(DISTINCT friend) AS mutualConnections,
+            sum(1.0 / log(CASE WHEN degree > 2 THEN degree ELSE 2 END)) AS adamicAdar
+        WITH candidate, mutualConnections,
+            CASE WHEN $scoring = 'mutual' THEN toFloat(mutualConnections) ELSE adamicAdar END AS score
+        RETURN candidate AS suggestion, mutualConnections, score
+        ORDER BY score DESC, suggestion.username
+        SKIP $skip
+        LIMIT $limit
+    }
+"""
+
+def scoring_params(scoring=DEFAULT_SCORING, skip=0, limit=RECOMMENDATION_PAGE_SIZE,
+                   max_friends=RECOMMENDATION_MAX_FRIENDS, max_fanout=RECOMMENDATION_MAX_FANOUT):
+    """
+    Returns the query parameters used by SCORED_SUGGESTIONS.
+    """
+    if scoring not in SCORING_METHODS:
+        raise ValueError(f"Unknown scoring method '{scoring}', expected one of {SCORING_METHODS}")
+    return {
+        "scoring": scoring,
+        "skip": skip,
+        "limit": limit,
+        "max_friends": max_friends,
+        "max_fanout": max_fanout,
+    }
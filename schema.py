@@ -0,0 +1,84 @@
+# Creates the constraints and indexes the queries rely on. Every statement is idempotent.
+import argparse
+from db_connection import get_driver
+from helpers import print_error, print_success
+
+SCHEMA_STATEMENTS = {
+    "user_username_unique": "CREATE CONSTRAINT user_username_unique IF NOT EXISTS FOR (u:User) REQUIRE u.username IS UNIQUE",
+    "user_email_unique": "CREATE CONSTRAINT user_email_unique IF NOT EXISTS FOR (u:User) REQUIRE u.email IS UNIQUE",
+    "user_id_unique": "CREATE CONSTRAINT user_id_unique IF NOT EXISTS FOR (u:User) REQUIRE u.id IS UNIQUE",
+    "user_name": "CREATE INDEX user_name IF NOT EXISTS FOR (u:User) ON (u.name)",
+    "user_followers_count": "CREATE INDEX user_followers_count IF NOT EXISTS FOR (u:User) ON (u.followersCount)",
+    "user_search": "CREATE FULLTEXT INDEX user_search IF NOT EXISTS FOR (u:User) ON EACH [u.name, u.username, u.bio, u.location]",
+}
+
+INDEX_WAIT_SECONDS = 300
+
+# followersCount/followingCount are maintained by follow and unfollow; users that predate the
+# counters are counted once from their relationships. CALL { } IN TRANSACTIONS needs an
+# auto-commit transaction, so this runs with session.run.
+BACKFILL_BATCH_SIZE = 10000
+BACKFILL_FOLLOW_COUNTS_QUERY = """
+    MATCH (u:User)
+    WHERE u.followersCount IS NULL OR u.followingCount IS NULL
+    CALL {
+        WITH u
+        SET u.followersCount = COUNT { (u)<-[:FOLLOWS]-(:User) },
+            u.followingCount = COUNT { (u)-[:FOLLOWS]->(:User) }
+    } IN TRANSACTIONS OF $batch_size ROWS
+"""
+
+def create_schema(tx, statement):
+    tx.run(statement).consume()
+
+def await_indexes(tx, timeout):
+    tx.run("CALL db.awaitIndexes($timeout)", timeout=timeout).consume()
+
+def get_index_states(tx, names):
+    query = """
+    SHOW INDEXES YIELD name, owningConstraint, state
+    WHERE name IN $names OR owningConstraint IN $names
+    RETURN coalesce(owningConstraint, name) AS name, state
+    """
+    result = tx.run(query, names=names)
+    return {record["name"]: record["state"] for record in result}
+
+def backfill_follow_counts(batch_size=BACKFILL_BATCH_SIZE):
+    """
+    Sets the follow counters on every user that has none yet. Returns the number of users updated.
+    """
+    with get_driver().session() as session:
+        summary = session.run(BACKFILL_FOLLOW_COUNTS_QUERY, batch_size=batch_size).consume()
+        return summary.counters.properties_set // 2
+
+def ensure_schema(timeout=INDEX_WAIT_SECONDS):
+    """
+    Creates any missing constraints/indexes and waits until all of them are ONLINE, then
+    backfills the follow counters the leaderboard and dashboard read.
+    Returns True when the schema is ready to serve queries.
+    """
+    driver = get_driver()
+    names = list(SCHEMA_STATEMENTS)
+    with driver.session() as session:
+        for statement in SCHEMA_STATEMENTS.values():
+            session.execute_write(create_schema, statement)
+        session.execute_read(await_indexes, timeout)
+        states = session.execute_read(get_index_states, names)
+
+    not_online = [name for name in names if states.get(name) != "ONLINE"]
+    if not_online:
+        print_error(f"Schema not ready, indexes not ONLINE: {', '.join(not_online)}")
+        return False
+
+    backfilled = backfill_follow_counts()
+    if backfilled:
+        print_success(f"Backfilled follow counters for {backfilled} users.")
+    return True
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Create the Neo4j constraints and indexes used by the app.")
+    parser.add_argument("--timeout", type=int, default=INDEX_WAIT_SECONDS, help="seconds to wait for indexes to come ONLINE")
+    args = parser.parse_args()
+
+    if ensure_schema(args.timeout):
+        print_success("Schema is up to date and all indexes are ONLINE.")
@@ -0,0 +1,27 @@
+# Builds Lucene queries for the user_search full-text index (see schema.py)
+import re
+
+SEARCH_INDEX = "user_search"
+SEARCH_PAGE_SIZE = 10
+
+# split on the same boundaries as the index analyzer, which also drops Lucene syntax characters
+WORD_PATTERN = re.compile(r"\w+")
+
+def build_fulltext_query(text, fuzzy=True, prefix=True):
+    """
+    Turns free text into a Lucene query where every word must match, either exactly
+    (boosted), as a prefix ("jo" -> "john") or with one typo ("jhon" -> "john").
+    Returns None when the text contains no searchable words.
+    """
+    clauses = []
+    for term in WORD_PATTERN.findall(text.lower()):
+        options = [f"{term}^3"]
+        if prefix:
+            options.append(f"{term}*")
+        if fuzzy and len(term) > 2:
+            options.append(f"{term}~1")
+        clauses.append("(" + " OR ".join(options) + ")")
+
+    if not clauses:
+        return None
+    return " AND ".join(clauses)
@@ -0,0 +1,7 @@
+# Loads the env file into os.environ. Import it before reading settings with os.getenv at
+# module level; modules imported ahead of db_connection would otherwise see only the defaults.
+import dotenv
+
+ENV_FILE = "Neo4j-59c90b3a-Created-2025-04-12.txt"
+
+load_status = dotenv.load_dotenv(ENV_FILE)
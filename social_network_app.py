@@ -1,6 +1,8 @@
 import os
 import sys
 import queries
+import schema
+import views
 from helpers import blue_text, bold_text, bold_underline, print_error
 
 curr_user = {}
@@ -39,12 +41,13 @@ def login():
     print('\n', message)
 
     if u is not None:
-        curr_user['name'] = u['name']
-        curr_user['username'] = u['username']
-        curr_user['email'] = u['email']
-        curr_user["bio"] = u["bio"]
-        curr_user["location"] = u["location"]
-        curr_user["password"] = u["password"]
+        curr_user['name'] = u.name
+        curr_user['username'] = u.username
+        curr_user['email'] = u.email
+        curr_user["bio"] = u.bio or ""
+        curr_user["location"] = u.location or ""
+        # the password is never sent back from the database; keep the one that was just verified
+        curr_user["password"] = password
         return True
 
     return False
@@ -67,20 +70,51 @@ def show_menu():
 
     print("\n10. Exit")
 
-def show_edit_user_menu():
+# menu number -> (curr_user key, label) for the editable profile fields
+EDITABLE_FIELDS = {
+    "1": ("name", "Name"),
+    "2": ("username", "Username"),
+    "3": ("password", "Password"),
+    "4": ("bio", "Bio"),
+    "5": ("location", "Location"),
+}
+
+def show_edit_user_menu(pending):
+    """
+    Lists the editable fields with their staged values; unsaved ones are marked with *.
+    """
     print(bold_underline("\nEditing User:"))
-    print(f"1. Edit Name ({blue_text(curr_user['name'])})")
-    print(f"2. Edit Username ({blue_text(curr_user['username'])})")
-    print(f"3. Edit Password ({blue_text(curr_user['password'])})")
-    print(f"4. Edit Bio ({blue_text(curr_user['bio'])})")
-    print(f"5. Edit Location ({blue_text(curr_user['location'])})")
-    print("\n6. Main Menu")
+    for number, (field, label) in EDITABLE_FIELDS.items():
+        value = pending.get(field, curr_user[field])
+        marker = " *" if field in pending else ""
+        print(f"{number}. Edit {label} ({blue_text(value)}){marker}")
+    print("\n6. Save Changes")
+    print("7. Main Menu")
+
+def show_pages(show_page, page_size):
+    """
+    Calls show_page(skip) for the first page and again for every further page the user asks for.
+    show_page must return True while more results are available.
+    """
+    skip = 0
+    has_more = show_page(skip)
+    while has_more:
+        more_choice = input("\nShow more results? (y/n): ").lower()
+        if more_choice != 'y' and more_choice != 'yes':
+            break
+        skip += page_size
+        has_more = show_page(skip)
 
 def main():
     os.system("cls")
     global curr_user
     authenticated = False
 
+    # make sure lookups are index-backed before serving any requests
+    if not schema.ensure_schema():
+        print_error("\nDatabase schema is not ready. Please try again later.")
+        return
+
     while not authenticated:
         print(f"\n{bold_underline('=== Social Network App ===')}\n")
         print("1. Login")
@@ -110,77 +144,44 @@ def main():
         choice = input("\n" + bold_text("Choose an option (1-10): "))
 
         if choice == "1":
-            # View profile information
-            queries.execute_get_profile(curr_user['username'])
+            # View profile information, friend counts and the first followers/following in one query
+            dashboard = views.show_profile_dashboard(curr_user['username'])
             
-            # Show friend counts
-            profile_choice = input("\nView your followers and following? (y/n): ").lower()
-            if profile_choice == 'y' or profile_choice == 'yes':
-                queries.execute_get_followers(curr_user['username'])
-                queries.execute_get_following(curr_user['username'])
+            # Show friend lists
+            if dashboard is not None:
+                profile_choice = input("\nView your followers and following? (y/n): ").lower()
+                if profile_choice == 'y' or profile_choice == 'yes':
+                    views.show_dashboard_lists(dashboard)
             
         elif choice == "2":
-            # edit user profile
+            # edit user profile: changes are staged and saved together in one transaction
+            pending = {}
             while True:
-                show_edit_user_menu()
-                edit_choice = input(f"\n{bold_text('Choose action (1-6): ')}")
-
-                if edit_choice == "1":
-                    # edit name
-                    print("\n" + blue_text("Current Name: ") + curr_user["name"])
-                    new_name = input(bold_text("Enter new name: "))
-
-                    success = queries.execute_update_name(curr_user["email"], new_name)
-
-                    # update name locally if update successful
-                    if success:
-                        curr_user['name'] = new_name
-
-                elif edit_choice == "2":
-                    # edit username
-                    print("\n" + blue_text("Current Username: ") + curr_user["username"])
-                    new_username = input(bold_text("Enter new username: "))
-
-                    success = queries.execute_update_username(curr_user["email"], new_username)
-
-                    # update username locally if update successful
-                    if success:
-                        curr_user['username'] = new_username
-
-                elif edit_choice == "3":
-                    # change password
-                    print("\n" + blue_text("Current Password: ") + curr_user["password"])
-                    new_password = input(bold_text("Enter new password: "))
-
-                    success = queries.execute_update_password(curr_user["email"], new_password)
-
-                    # update password locally if update successful
-                    if success:
-                        curr_user['password'] = new_password
-                
-                elif edit_choice == "4":
-                    # edit bio
-                    print("\n" + blue_text("Current Bio: ") + curr_user["bio"])
-                    new_bio = input(bold_text("Enter new bio: "))
-
-                    success = queries.execute_update_bio(curr_user["email"], new_bio)
-
-                    # update bio locally if update successful
-                    if success:
-                        curr_user['bio'] = new_bio
+                show_edit_user_menu(pending)
+                edit_choice = input(f"\n{bold_text('Choose action (1-7): ')}")
 
-                elif edit_choice == "5":
-                    # edit location
-                    print("\n" + blue_text("Current Location: ") + curr_user["location"])
-                    new_location = input(bold_text("Enter new location: "))
+                if edit_choice in EDITABLE_FIELDS:
+                    field, label = EDITABLE_FIELDS[edit_choice]
+                    print("\n" + blue_text(f"Current {label}: ") + pending.get(field, curr_user[field]))
+                    new_value = input(bold_text(f"Enter new {label.lower()}: "))
 
-                    success = queries.execute_update_location(curr_user["email"], new_location)
+                    if field in queries.REQUIRED_PROFILE_FIELDS and len(new_value) == 0:
+                        print_error(f"Error: {label} cannot be empty!")
+                    else:
+                        pending[field] = new_value
 
-                    # update location locally if update successful
-                    if success:
-                        curr_user['location'] = new_location
-                    
                 elif edit_choice == "6":
+                    # save all staged changes
+                    if len(pending) == 0:
+                        print("\nNo changes to save.")
+                    elif views.show_update_profile(curr_user["email"], pending) == "updated":
+                        # update the fields locally once saved
+                        curr_user.update(pending)
+                        pending = {}
+
+                elif edit_choice == "7":
+                    if len(pending) > 0:
+                        print_error("\nUnsaved changes were discarded.")
                     break
                 else:
                     print_error("\nInvalid choice! Please try again...")
@@ -192,7 +193,7 @@ def main():
             if len(target_username) == 0:
                 print_error("Error: Username cannot be empty!")
             else:
-                queries.execute_follow(currentUsername=curr_user["username"], targetUsername=target_username)
+                views.show_follow(currentUsername=curr_user["username"], targetUsername=target_username)
 
         elif choice == "4":
             # unfollow another user
@@ -200,12 +201,12 @@ def main():
             if len(target_username) == 0:
                 print_error("Username cannot be empty!")
             else:
-                queries.execute_unfollow(currentUsername=curr_user["username"], targetUsername=target_username)
+                views.show_unfollow(currentUsername=curr_user["username"], targetUsername=target_username)
 
         elif choice == "5":
             # get following anf followers
-            queries.execute_get_followers(username=curr_user["username"])
-            queries.execute_get_following(username=curr_user["username"])
+            views.show_followers(curr_user["username"])
+            views.show_following(curr_user["username"])
 
         elif choice == "6":
             # see mutuals with a connection
@@ -213,11 +214,11 @@ def main():
             if len(target_username) == 0:
                  print_error("Username cannot be empty!")
             else:
-                queries.execute_get_mutuals(currentUsername=curr_user["username"], friendUsername=target_username)
+                show_pages(lambda skip: views.show_mutuals(currentUsername=curr_user["username"], friendUsername=target_username, skip=skip), queries.MUTUALS_PAGE_SIZE)
 
         elif choice == "7":
             # friend recommendations
-            queries.execute_get_recommendations(curr_user['username'])
+            show_pages(lambda skip: views.show_recommendations(curr_user['username'], skip=skip), queries.RECOMMENDATION_PAGE_SIZE)
 
         elif choice == "8":
             # search users
@@ -225,11 +226,11 @@ def main():
             if len(target) == 0:
                 print_error("\nInput cannot be empty!")
             else:
-                queries.execute_search_users(target=target) 
+                show_pages(lambda skip: views.show_search_results(target=target, skip=skip), queries.SEARCH_PAGE_SIZE)
 
         elif choice == "9":
             # explore popular users
-            queries.execute_get_most_followed()
+            views.show_most_followed()
 
         elif choice == "10":
             print("Thank you, come again!")
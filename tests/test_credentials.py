@@ -0,0 +1,85 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip("dotenv")
+
+import credentials
+from change_log import ChangeEvent
+from credentials import (
+    SessionCache, check_password, check_password_async, hash_password, hash_passwords, needs_rehash, parse_hash,
+    verify_password,
+)
+
+# a low cost keeps the tests fast; the parameters travel inside every hash
+CHEAP = {"n": 1024, "r": 8, "p": 1}
+
+def test_hash_round_trip():
+    password_hash = hash_password("secret", **CHEAP)
+    assert password_hash.startswith("scrypt$1024$8$1$")
+    assert verify_password("secret", password_hash)
+    assert not verify_password("Secret", password_hash)
+
+def test_hashes_are_salted():
+    assert hash_password("secret", **CHEAP) != hash_password("secret", **CHEAP)
+
+def test_malformed_hashes_never_verify():
+    for value in (None, "", "secret", "bcrypt$1$2$3$4$5", "scrypt$x$8$1$AA==$AA=="):
+        assert parse_hash(value) is None
+        assert not verify_password("secret", value)
+
+def test_needs_rehash_follows_the_configured_cost(monkeypatch):
+    password_hash = hash_password("secret", **CHEAP)
+    monkeypatch.setattr(credentials, "SCRYPT_N", 1024)
+    assert not needs_rehash(password_hash)
+    monkeypatch.setattr(credentials, "SCRYPT_N", 2048)
+    assert needs_rehash(password_hash)
+
+def test_check_password_upgrades_legacy_plaintext_accounts():
+    assert check_password("secret", None, "secret") == (True, True)
+    assert check_password("wrong", None, "secret") == (False, False)
+
+def test_check_password_rejects_unknown_users():
+    assert check_password("secret", None, None) == (False, False)
+
+def test_check_password_async_matches_the_sync_result(monkeypatch):
+    monkeypatch.setattr(credentials, "SCRYPT_N", 1024)
+    password_hash = hash_password("secret", **CHEAP)
+    assert asyncio.run(check_password_async("secret", password_hash)) == (True, False)
+
+def test_hash_passwords_keeps_input_order():
+    hashes = hash_passwords(["a", "b", "c"])
+    assert [verify_password(password, password_hash) for password, password_hash in zip("abc", hashes)] == [True] * 3
+
+def test_session_tokens_resolve_until_revoked():
+    sessions = SessionCache(ttl=60)
+    token = sessions.issue("alice")
+    assert sessions.get(token) == "alice"
+    assert sessions.get("forged") is None
+    sessions.revoke(token)
+    assert sessions.get(token) is None
+
+def test_sessions_expire():
+    sessions = SessionCache(ttl=0)
+    assert sessions.get(sessions.issue("alice")) is None
+
+def test_oldest_session_is_dropped_beyond_max_size():
+    sessions = SessionCache(ttl=60, max_size=2)
+    first, second, third = (sessions.issue(name) for name in ("alice", "bob", "carol"))
+    assert sessions.get(first) is None
+    assert (sessions.get(second), sessions.get(third)) == ("bob", "carol")
+
+def test_revoke_user_ends_every_session_of_that_user():
+    sessions = SessionCache(ttl=60)
+    tokens = [sessions.issue("alice"), sessions.issue("alice")]
+    other = sessions.issue("bob")
+    sessions.revoke_user("alice")
+    assert [sessions.get(token) for token in tokens] == [None, None]
+    assert sessions.get(other) == "bob"
+
+def test_sessions_follow_a_rename():
+    sessions = SessionCache(ttl=60)
+    token = sessions.issue("alice")
+    sessions.apply(ChangeEvent(1, 0.0, "rename", "alice", "alicia"))
+    sessions.apply(ChangeEvent(2, 0.0, "update", "alicia", fields={"bio": "new"}))
+    assert sessions.get(token) == "alicia"
@@ -0,0 +1,29 @@
+from collections import Counter
+
+import pytest
+
+np = pytest.importorskip("numpy")
+pd = pytest.importorskip("pandas")
+
+from data import generate_passwords, generate_usernames
+
+def test_usernames_are_unique_across_chunks():
+    seen = Counter()
+    first = generate_usernames(pd.Series(["Ann Lee", "ann lee", "Bob", "ANN-LEE"]), seen)
+    second = generate_usernames(pd.Series(["Ann Lee", "Bob"]), seen)
+    assert first.tolist() == ["annlee_1", "annlee_2", "bob_1", "annlee_3"]
+    assert second.tolist() == ["annlee_4", "bob_2"]
+
+def test_usernames_of_different_bases_cannot_collide():
+    # without stripping "_", "ann_1" + occurrence could equal "ann" + "_1" + occurrence
+    usernames = generate_usernames(pd.Series(["ann_1", "ann", "ann 1", "ann"]), Counter())
+    assert usernames.is_unique
+
+def test_empty_and_symbol_only_names_fall_back_to_user():
+    usernames = generate_usernames(pd.Series([None, "", "!!!", "José"]), Counter())
+    assert usernames.tolist() == ["user_1", "user_2", "user_3", "josé_1"]
+
+def test_generated_passwords_are_alphanumeric():
+    passwords = generate_passwords(np.random.default_rng(0), 50, length=8).tolist()
+    assert len(passwords) == 50
+    assert all(len(password) == 8 and password.isalnum() for password in passwords)
@@ -0,0 +1,171 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+
+import graph_engine
+from change_log import ChangeEvent
+from graph_engine import PROFILE_FIELDS, GraphEngine
+
+USERNAMES = ["alice", "bob", "carol", "dave", "erin", "frank"]
+# (source, target) positions in USERNAMES
+EDGES = [(0, 1), (0, 2), (0, 3), (1, 2), (2, 0), (3, 0), (3, 1), (4, 0), (4, 2), (5, 4)]
+
+def make_engine(edges=EDGES, usernames=USERNAMES):
+    profiles = {field: [f"{name}@example.com" if field == "email" else name for name in usernames] for field in PROFILE_FIELDS}
+    sources, targets = zip(*edges)
+    return GraphEngine(profiles, np.array(sources), np.array(targets))
+
+class Events:
+    def __init__(self, engine):
+        self.engine = engine
+        self.sequence = 0
+
+    def __call__(self, kind, username, target=None, fields=None):
+        self.sequence += 1
+        self.engine.apply(ChangeEvent(self.sequence, 0.0, kind, username, target, fields))
+
+def names(users):
+    return [user.username for user in users]
+
+def expected_following(engine, username):
+    return sorted(engine.columns["username"][j] for j in engine.out_row(engine.index(username)))
+
+def test_rows_are_sorted_by_username():
+    engine = make_engine()
+    assert names(engine.following("alice")) == ["bob", "carol", "dave"]
+    assert names(engine.followers("alice")) == ["carol", "dave", "erin"]
+    assert names(engine.following("alice", after="bob", limit=1)) == ["carol"]
+
+def test_duplicate_edges_and_self_loops_are_dropped():
+    engine = make_engine(EDGES + [(0, 1), (2, 2)])
+    assert names(engine.following("alice")) == ["bob", "carol", "dave"]
+    assert names(engine.following("carol")) == ["alice"]
+
+def test_follow_and_unfollow_go_through_the_overlays():
+    engine = make_engine()
+    apply = Events(engine)
+    apply("follow", "frank", "alice")
+    apply("unfollow", "alice", "bob")
+    assert names(engine.followers("alice")) == ["carol", "dave", "erin", "frank"]
+    assert names(engine.following("alice")) == ["carol", "dave"]
+    assert names(engine.followers("bob")) == ["dave"]
+
+def test_applying_an_event_twice_is_a_no_op():
+    engine = make_engine()
+    apply = Events(engine)
+    apply("follow", "frank", "alice")
+    apply("follow", "frank", "alice")
+    apply("unfollow", "alice", "bob")
+    apply("unfollow", "alice", "bob")
+    assert names(engine.following("frank")) == ["alice", "erin"]
+    assert names(engine.following("alice")) == ["carol", "dave"]
+
+def test_unfollow_then_follow_restores_the_base_edge():
+    engine = make_engine()
+    apply = Events(engine)
+    apply("unfollow", "alice", "bob")
+    apply("follow", "alice", "bob")
+    assert engine.stats()["pending_rows"] == 0
+    assert names(engine.following("alice")) == ["bob", "carol", "dave"]
+
+def test_events_about_unknown_users_are_ignored():
+    engine = make_engine()
+    apply = Events(engine)
+    apply("follow", "alice", "nobody")
+    apply("rename", "nobody", "somebody")
+    assert names(engine.following("alice")) == ["bob", "carol", "dave"]
+    assert engine.index("somebody") is None
+
+def test_new_user_is_paged_in_username_order():
+    engine = make_engine()
+    apply = Events(engine)
+    apply("create", "bobby", fields={"name": "Bobby", "username": "bobby", "email": "bobby@example.com"})
+    apply("follow", "alice", "bobby")
+    apply("follow", "bobby", "alice")
+
+    assert names(engine.following("alice")) == ["bob", "bobby", "carol", "dave"]
+    assert names(engine.following("alice", after="bob", limit=2)) == ["bobby", "carol"]
+    assert names(engine.followers("alice")) == ["bobby", "carol", "dave", "erin"]
+
+def test_rename_moves_the_user_in_every_row():
+    engine = make_engine()
+    apply = Events(engine)
+    apply("rename", "bob", "zed")
+    assert engine.index("bob") is None
+    assert names(engine.following("alice")) == ["carol", "dave", "zed"]
+    assert names(engine.following("alice", after="dave")) == ["zed"]
+    assert names(engine.followers("carol")) == ["alice", "erin", "zed"]
+
+def test_only_rows_with_a_renamed_or_new_user_lose_id_order():
+    engine = make_engine()
+    apply = Events(engine)
+    apply("rename", "bob", "zed")
+    # alice follows bob; frank's row only holds erin
+    assert not engine.is_ordered(engine.out_row(engine.index("alice")))
+    assert engine.is_ordered(engine.out_row(engine.index("frank")))
+    assert engine.is_ordered(engine.in_row(engine.index("erin")))
+
+def test_renames_and_signups_count_towards_compaction(monkeypatch):
+    monkeypatch.setattr(graph_engine, "GRAPH_COMPACT_THRESHOLD", 2)
+    engine = make_engine()
+    apply = Events(engine)
+    apply("rename", "bob", "zed")
+    apply("create", "gina", fields={"name": "Gina", "username": "gina", "email": "gina@example.com"})
+    assert engine.compactions == 0
+    apply("create", "hank", fields={"name": "Hank", "username": "hank", "email": "hank@example.com"})
+    assert engine.compactions == 1
+    assert engine.stats()["pending_rows"] == 0
+    assert engine.is_ordered(engine.out_row(engine.index("alice")))
+
+def test_compact_keeps_every_change():
+    engine = make_engine()
+    apply = Events(engine)
+    apply("create", "bobby", fields={"name": "Bobby", "username": "bobby", "email": "bobby@example.com"})
+    apply("follow", "alice", "bobby")
+    apply("unfollow", "alice", "carol")
+    apply("rename", "dave", "aaron")
+    apply("update", "erin", fields={"bio": "new bio"})
+
+    before = {username: (expected_following(engine, username), names(engine.followers(username))) for username in engine.ids}
+    engine.compact()
+    after = {username: (names(engine.following(username)), names(engine.followers(username))) for username in engine.ids}
+
+    assert after == before
+    assert engine.stats()["pending_rows"] == 0
+    assert engine.columns["bio"][engine.index("erin")] == "new bio"
+    assert list(engine.usernames) == sorted(engine.usernames)
+
+def test_mutuals_and_recommendations_after_a_rename():
+    engine = make_engine()
+    apply = Events(engine)
+    apply("rename", "alice", "zoe")
+
+    total, page = engine.mutuals("dave", "erin")
+    assert (total, names(page)) == (1, ["zoe"])
+
+    recommended = engine.recommendations("frank", scoring="mutual")
+    # best score first, ties by the current usernames
+    assert recommended == sorted(recommended, key=lambda user: (-user.score, user.username))
+    assert "zoe" in names(recommended)
+    assert "frank" not in names(recommended) and "erin" not in names(recommended)
+
+def test_most_followed_counts_pending_changes():
+    engine = make_engine()
+    apply = Events(engine)
+    apply("follow", "frank", "bob")
+    apply("follow", "erin", "bob")
+    top = engine.most_followed(limit=2)
+    assert [(user.username, user.followersCount) for user in top] == [("bob", 4), ("alice", 3)]
+
+def test_dashboard_matches_the_lists_and_counts():
+    engine = make_engine()
+    apply = Events(engine)
+    apply("rename", "bob", "zed")
+    apply("follow", "frank", "alice")
+
+    dashboard = engine.dashboard("alice", list_limit=2)
+    assert dashboard.profile.username == "alice" and dashboard.profile.email == "alice@example.com"
+    assert (dashboard.followersCount, dashboard.followingCount) == (4, 3)
+    assert names(dashboard.followers) == ["carol", "dave"]
+    assert names(dashboard.following) == ["carol", "dave"]
+    assert engine.dashboard("nobody", list_limit=2) is None
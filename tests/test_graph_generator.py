@@ -0,0 +1,48 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("pandas")
+
+from graph_generator import DEGREE_DISTRIBUTIONS, generate_edge_chunks
+
+def edges(**kwargs):
+    chunks = list(generate_edge_chunks(**kwargs))
+    return np.concatenate(chunks) if chunks else np.zeros((0, 2), dtype=np.int64)
+
+@pytest.mark.parametrize("distribution", DEGREE_DISTRIBUTIONS)
+def test_directed_edges_are_unique_and_loop_free(distribution):
+    pairs = edges(n_users=500, distribution=distribution, min_degree=3, max_degree=20,
+                  community_size=50, seed=7, chunk_users=64)
+    assert len(pairs) > 0
+    assert (pairs[:, 0] != pairs[:, 1]).all()
+    assert len(np.unique(pairs, axis=0)) == len(pairs)
+    assert pairs.min() >= 0 and pairs.max() < 500
+
+def test_undirected_pairs_are_deduplicated_across_chunks():
+    # tiny chunks make the same pair likely to be drawn from both ends in different batches
+    pairs = edges(n_users=40, min_degree=10, max_degree=20, directed=False, seed=3, chunk_users=4)
+    assert (pairs[:, 0] < pairs[:, 1]).all()
+    assert len(np.unique(pairs, axis=0)) == len(pairs)
+
+def test_uniform_degrees_stay_in_range():
+    pairs = edges(n_users=300, min_degree=3, max_degree=6, seed=1)
+    degrees = np.bincount(pairs[:, 0], minlength=300)
+    # duplicates are dropped, so a user can end up below min_degree but never above max_degree
+    assert degrees.max() <= 6
+
+def test_community_follows_mostly_stay_in_the_block():
+    pairs = edges(n_users=1000, distribution="community", community_size=100, p_within=0.9, seed=5)
+    within = (pairs[:, 0] // 100) == (pairs[:, 1] // 100)
+    assert within.mean() > 0.8
+
+def test_same_seed_gives_the_same_graph():
+    first = edges(n_users=200, distribution="powerlaw", seed=11)
+    second = edges(n_users=200, distribution="powerlaw", seed=11)
+    assert np.array_equal(first, second)
+
+def test_degenerate_inputs():
+    assert len(edges(n_users=1)) == 0
+    pairs = edges(n_users=2, min_degree=1, max_degree=5, seed=0)
+    assert {tuple(pair) for pair in pairs.tolist()} <= {(0, 1), (1, 0)}
+    with pytest.raises(ValueError):
+        edges(n_users=10, distribution="nope")
@@ -0,0 +1,86 @@
+import threading
+import time
+
+from leaderboard import LeaderboardCache
+
+class Counter:
+    def __init__(self):
+        self.calls = 0
+        self.fetched = threading.Event()
+
+    def __call__(self):
+        self.calls += 1
+        self.fetched.set()
+        return self.calls
+
+def wait_for_refresh(cache, timeout=1.0):
+    deadline = time.monotonic() + timeout
+    while cache._refreshing and time.monotonic() < deadline:
+        time.sleep(0.001)
+
+def test_get_fetches_once_and_then_serves_from_memory():
+    fetch = Counter()
+    cache = LeaderboardCache(fetch, ttl=60, refresh_interval=0)
+    assert cache.get() == 1
+    assert cache.get() == 1
+    assert fetch.calls == 1
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+def test_invalidate_before_anything_is_loaded_does_not_fetch():
+    fetch = Counter()
+    cache = LeaderboardCache(fetch, ttl=60, refresh_interval=0)
+    cache.invalidate()
+    assert not fetch.fetched.wait(0.05)
+    assert fetch.calls == 0
+
+def test_invalidate_serves_the_old_value_while_refreshing():
+    fetch = Counter()
+    cache = LeaderboardCache(fetch, ttl=60, refresh_interval=0)
+    cache.get()
+    fetch.fetched.clear()
+    cache.invalidate()
+    assert fetch.fetched.wait(1.0)
+    wait_for_refresh(cache)
+    assert cache.get() == 2
+
+def test_invalidate_during_a_refresh_fetches_again():
+    release = threading.Event()
+    started = threading.Event()
+    calls = []
+
+    def fetch():
+        calls.append(None)
+        if len(calls) == 2:
+            started.set()
+            release.wait(1.0)
+        return len(calls)
+
+    cache = LeaderboardCache(fetch, ttl=60, refresh_interval=0)
+    cache.get()
+    cache.invalidate()
+    assert started.wait(1.0)
+    # lands while the second fetch is running, so its result must not be kept as fresh
+    cache.invalidate()
+    release.set()
+    wait_for_refresh(cache)
+    assert len(calls) == 3
+    assert cache.get() == 3
+    assert cache.stats()["hits"] == 1
+
+def test_expired_value_is_served_stale_and_refreshed():
+    fetch = Counter()
+    cache = LeaderboardCache(fetch, ttl=0, stale_ttl=60, refresh_interval=0)
+    assert cache.get() == 1
+    fetch.fetched.clear()
+    assert cache.get() == 1
+    assert fetch.fetched.wait(1.0)
+    assert cache.stats()["stale_hits"] == 1
+
+def test_failed_background_refresh_keeps_the_previous_value():
+    values = iter([1])
+    cache = LeaderboardCache(lambda: next(values), ttl=0, stale_ttl=60, refresh_interval=0)
+    assert cache.get() == 1
+    assert cache.get() == 1
+    wait_for_refresh(cache)
+    assert cache.stats()["refresh_errors"] == 1
+    assert cache.get() == 1
@@ -0,0 +1,98 @@
+from change_log import ChangeEvent
+from models import Profile
+from profile_cache import ProfileCache
+
+class Store:
+    """
+    Stands in for the database: records every fetch the cache makes.
+    """
+
+    def __init__(self, *profiles):
+        self.profiles = {profile.username: profile for profile in profiles}
+        self.fetched = []
+
+    def fetch_many(self, usernames):
+        self.fetched.append(list(usernames))
+        return [self.profiles[username] for username in usernames if username in self.profiles]
+
+    def fetch_by_email(self, email):
+        self.fetched.append(email)
+        return next((profile for profile in self.profiles.values() if profile.email == email), None)
+
+def profile(username):
+    return Profile(username.title(), username, f"{username}@example.com")
+
+def make_cache(store, **kwargs):
+    return ProfileCache(store.fetch_many, store.fetch_by_email, **kwargs)
+
+def test_misses_are_fetched_together_and_then_served_from_memory():
+    store = Store(profile("alice"), profile("bob"))
+    cache = make_cache(store)
+    assert set(cache.get_many(["alice", "bob", "nobody"])) == {"alice", "bob"}
+    assert cache.get("alice") == profile("alice")
+    assert store.fetched == [["alice", "bob", "nobody"]]
+    assert cache.stats()["hits"] == 1
+
+def test_least_recently_used_entry_is_evicted():
+    store = Store(profile("alice"), profile("bob"), profile("carol"))
+    cache = make_cache(store, max_size=2)
+    cache.get("alice")
+    cache.get("bob")
+    cache.get("alice")
+    cache.get("carol")
+    assert cache.stats()["evictions"] == 1
+    store.fetched.clear()
+    cache.get_many(["alice", "carol"])
+    assert store.fetched == []
+    cache.get("bob")
+    assert store.fetched == [["bob"]]
+
+def test_entries_expire_after_the_ttl():
+    store = Store(profile("alice"))
+    cache = make_cache(store, ttl=0)
+    cache.get("alice")
+    cache.get("alice")
+    assert len(store.fetched) == 2
+    assert cache.stats()["expirations"] == 1
+
+def test_cached_never_fetches():
+    store = Store(profile("alice"))
+    cache = make_cache(store)
+    assert cache.cached("alice") is None
+    cache.put(profile("alice"))
+    assert cache.cached("alice") == profile("alice")
+    assert store.fetched == []
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 1)
+
+def test_lookup_by_email_uses_the_username_entries():
+    store = Store(profile("alice"))
+    cache = make_cache(store)
+    cache.get("alice")
+    assert cache.get_by_email("alice@example.com") == profile("alice")
+    assert store.fetched == [["alice"]]
+    assert cache.get_by_email("nobody@example.com") is None
+
+def test_eviction_drops_the_email_index_entry():
+    store = Store(profile("alice"), profile("bob"))
+    cache = make_cache(store, max_size=1)
+    cache.get("alice")
+    cache.get("bob")
+    store.fetched.clear()
+    assert cache.get_by_email("alice@example.com") == profile("alice")
+    assert store.fetched == ["alice@example.com"]
+
+def test_rename_and_update_events_invalidate():
+    store = Store(profile("alice"), profile("bob"))
+    cache = make_cache(store)
+    cache.get_many(["alice", "bob"])
+    cache.apply(ChangeEvent(1, 0.0, "rename", "alice", "alicia"))
+    cache.apply(ChangeEvent(2, 0.0, "update", "bob", fields={"bio": "new"}))
+    cache.apply(ChangeEvent(3, 0.0, "follow", "bob", "alice"))
+    assert cache.stats()["size"] == 0
+
+def test_disabled_cache_always_fetches():
+    store = Store(profile("alice"))
+    cache = make_cache(store, max_size=0)
+    cache.get("alice")
+    cache.get("alice")
+    assert len(store.fetched) == 2
@@ -0,0 +1,221 @@
+# Terminal presentation layer: calls the data-access functions in queries.py and prints the results
+import functools
+from neo4j import exceptions
+import queries
+from helpers import blue_text, orange_text, bold_underline, print_error, print_success
+
+def report_db_errors(view):
+    """
+    Prints database errors instead of crashing the menu loop. The view then returns None.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        try:
+            return view(*args, **kwargs)
+        except exceptions.Neo4jError as e:
+            print_error(f"Neo4j Error: {e.message}")
+            return None
+    return wrapper
+
+def print_profile(profile):
+    print(f"\n{bold_underline('Profile Information:')}")
+    print(f"{blue_text('Name')}: {profile.name}")
+    print(f"{blue_text('Username')}: {profile.username}")
+    print(f"{blue_text('Email')}: {profile.email}")
+    if profile.bio:
+        print(f"{blue_text('Bio')}: {profile.bio}")
+    if profile.location:
+        print(f"{blue_text('Location')}: {profile.location}")
+
+def print_user_pages(pages, empty_message):
+    """
+    Prints pages one at a time, asking before fetching the next one.
+    """
+    shown = 0
+    for page in pages:
+        if shown > 0:
+            more_choice = input("\nShow next page? (y/n): ").lower()
+            if more_choice != 'y' and more_choice != 'yes':
+                return
+        for user in page:
+            print(f"{user.name} - {user.username}")
+        shown += len(page)
+    if shown == 0:
+        print(empty_message)
+
+# View Profile - A user can view their own profile information
+@report_db_errors
+def show_profile_dashboard(username):
+    """
+    Prints the profile with its follow counts. Returns the dashboard so the lists
+    can be shown with show_dashboard_lists() without another query.
+    """
+    dashboard = queries.execute_get_profile_dashboard(username)
+    if dashboard is None:
+        print_error(f"User with username '{username}' not found.")
+        return None
+
+    print_profile(dashboard.profile)
+    print(f"{blue_text('Followers')}: {dashboard.followersCount} - {blue_text('Following')}: {dashboard.followingCount}")
+    return dashboard
+
+def show_dashboard_lists(dashboard):
+    """
+    Prints the followers and following already fetched with the dashboard.
+    """
+    print(bold_underline("\nYour Followers:"))
+    print_user_pages([dashboard.followers] if dashboard.followers else [], "You currently have no users following you.")
+    if dashboard.followersCount > len(dashboard.followers):
+        print(f"...and {dashboard.followersCount - len(dashboard.followers)} more (see View Friends/Connections)")
+
+    print(bold_underline("\nYour Following List:"))
+    print_user_pages([dashboard.following] if dashboard.following else [], "You are currently not following any users.")
+    if dashboard.followingCount > len(dashboard.following):
+        print(f"...and {dashboard.followingCount - len(dashboard.following)} more (see View Friends/Connections)")
+
+# View Friends/Connections - A user can see a list of people they are following and who follow them.
+@report_db_errors
+def show_following(username):
+    print(bold_underline("\nYour Following List:"))
+    print_user_pages(queries.iter_following(username), "You are currently not following any users.")
+
+@report_db_errors
+def show_followers(username):
+    print(bold_underline("\nYour Followers:"))
+    print_user_pages(queries.iter_followers(username), "You currently have no users following you.")
+
+# View Mutual Connections - A user can see mutual friends (users followed by both parties).
+@report_db_errors
+def show_mutuals(currentUsername, friendUsername, skip=0):
+    """
+    Prints one page of mutual friends. Returns True if there are more after this page.
+    """
+    total, mutuals = queries.execute_get_mutuals(currentUsername, friendUsername, skip=skip)
+    if skip == 0:
+        print(bold_underline(f"\nYour Mutual Friends ({total}):"))
+
+    if total == 0:
+        print("\nYou have no mutual friends with this user.")
+    else:
+        for user in mutuals:
+            print(f"{user.name} - {user.username}")
+    return skip + len(mutuals) < total
+
+# Follow Another User
+@report_db_errors
+def show_follow(currentUsername, targetUsername):
+    follow_result = queries.execute_follow(currentUsername, targetUsername)
+    if follow_result == "notFound":
+        print_error("The user doesn't exist in the system. Please try again.")
+    elif follow_result == "selfFollow":
+        print_error("You cannot follow yourself.")
+    elif follow_result == "alreadyFollowed":
+        print_error("You are already following this user.")
+    else:
+        print_success(f"You are now following {targetUsername}!")
+    return follow_result
+
+# Unfollow a User
+@report_db_errors
+def show_unfollow(currentUsername, targetUsername):
+    unfollow_result = queries.execute_unfollow(currentUsername, targetUsername)
+    if unfollow_result:
+        print_success(f"You unfollowed {targetUsername}!")
+    else:
+        print_error(f"Error: You don't follow {targetUsername}")
+    return unfollow_result
+
+# Search Users
+@report_db_errors
+def show_search_results(target, skip=0):
+    """
+    Prints one page of search results. Returns True if there are more results after this page.
+    """
+    limit = queries.SEARCH_PAGE_SIZE
+    # fetch one extra row to find out whether another page exists
+    users = queries.execute_search_users(target, skip=skip, limit=limit + 1)
+    has_more = len(users) > limit
+    users = users[:limit]
+
+    if skip == 0:
+        print(f"\n{bold_underline(f'Results for {target}: ')}")
+
+    if len(users) == 0:
+        print("No users matched your search" if skip == 0 else "No more results")
+    else:
+        for user in users:
+            output = f"{blue_text('Name')}: {user.name} - {blue_text('Username')}: {user.username}"
+            if user.bio:
+                output += f" - {blue_text('Bio')}: {user.bio}"
+            if user.location:
+                output += f" - {blue_text('Location')}: {user.location}"
+            print(output)
+    return has_more
+
+# Edit Profile
+@report_db_errors
+def show_update_profile(current_email, changes):
+    """
+    Saves all the staged profile changes in one transaction and reports the outcome.
+    """
+    status = queries.execute_update_profile(current_email, changes)
+    if status == "updated":
+        print_success("\nProfile updated successfully!")
+    elif status == "usernameTaken":
+        print_error("\nError: Username already taken!")
+    else:
+        print_error("\nAn error occurred")
+    return status
+
+# Friend Recommendations
+@report_db_errors
+def show_recommendations(current_username, skip=0):
+    """
+    Prints one page of recommendations. Returns True if there are more after this page.
+    """
+    if len(current_username) == 0:
+        print_error("Username cannot be empty!")
+        return False
+
+    limit = queries.RECOMMENDATION_PAGE_SIZE
+    # fetch one extra row to find out whether another page exists
+    recommendations = queries.execute_get_recommendations(current_username, skip=skip, limit=limit + 1)
+    has_more = len(recommendations) > limit
+    recommendations = recommendations[:limit]
+
+    if skip == 0:
+        print(f"\n{bold_underline(f'Recommendations: ')}")
+
+    if len(recommendations) == 0:
+        print("No recommendations found." if skip == 0 else "No more recommendations.")
+    else:
+        for user in recommendations:
+            output = f"{blue_text('Name')}: {user.name} - {blue_text('Username')}: {user.username}"
+            if user.bio:
+                output += f" - {blue_text('Bio')}: {user.bio}"
+            details = f"{user.mutualConnections} mutual, score {user.score:.2f}"
+            output += f" - {orange_text(details)}"
+            print(output)
+    return has_more
+
+# Explore Popular Users
+@report_db_errors
+def show_most_followed():
+    most_followed = queries.execute_get_most_followed()
+
+    print(f"\n{bold_underline(f'Top 10 most followed users: ')}")
+
+    if len(most_followed) == 0:
+        print("No users found.")
+        return
+
+    for count, user in enumerate(most_followed, start=1):
+        print(orange_text(f"{count}. {user.followersCount} followers"))
+
+        fields = []
+        for key in ("name", "username", "bio", "location"):
+            value = getattr(user, key)
+            if value:
+                fields.append(f"{blue_text(key)}: {value}")
+        print(" - ".join(fields))
+        print()